@@ -3,13 +3,15 @@ FastAPI application setup.
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from src.api.routes import router as api_router
 
 # Create FastAPI app
 app = FastAPI(
     title="Movie Script Generator Agent",
     description="AI agent that generates detailed movie scripts using CrewAI",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -81,12 +81,11 @@ async def create_task(request: Request):
         sessionId=session_id
     )
     # Format the response as JSON-RPC 2.0
-    response = {
+    return {
         "jsonrpc": "2.0",
         "id": body.get("id"),
-        "result": json.loads(task.json())
+        "result": task.model_dump(mode="json")
     }
-    return JSONResponse(content=response)
 
 @router.post("/tasks/sendSubscribe")
 async def send_task_streaming(request: Request):
@@ -164,11 +163,12 @@ async def send_task_streaming(request: Request):
     return stream_response
 
 @router.get("/tasks/{task_id}", response_model=Task)
-async def get_task(task_id: str):
+async def get_task(task_id: str, include_history: bool = False):
     """
     Get the current state of a task.
     
     @param {string} task_id The task ID to look up
+    @param {boolean} include_history Whether to include the task's status history
     @returns {Task} The task object
     @throws {404} If task not found
     """
@@ -177,7 +177,10 @@ async def get_task(task_id: str):
         status="task_status_checked",
         metadata={}
     )
-    return await controller.get_task(task_id)
+    task = await controller.get_task(task_id)
+    if not include_history:
+        task = task.model_copy(update={"history": None})
+    return task
 
 @router.post("/tasks/{task_id}/cancel", response_model=Task)
 async def cancel_task(task_id: str):
@@ -196,6 +199,22 @@ async def cancel_task(task_id: str):
     )
     return await controller.cancel_task(task_id)
 
+@router.get("/tasks/{task_id}/subscribe")
+async def subscribe_task(task_id: str):
+    """
+    Stream updates for an existing task in SSE format.
+
+    @param {string} task_id The task ID to follow
+    @returns {StreamingResponse} Stream of task updates until a terminal state
+    @throws {404} If task not found
+    """
+    logger.log_script_generation(
+        task_id=task_id,
+        status="task_subscribed",
+        metadata={}
+    )
+    return await controller.subscribe_task(task_id)
+
 @router.get("/tasks", response_model=List[Task])
 async def list_tasks(session_id: Optional[str] = None, state: Optional[str] = None):
     """
@@ -3,8 +3,8 @@ A2A Protocol Client Library
 This module provides a client implementation for the A2A protocol.
 """
 
-from .agent_client import AgentClient
+from .agent_client import AgentClient, RequestStatusError, StreamError, close_shared_connector
 from .agent_interpreter import AgentCardInterpreter
 from .models import TaskStatus, TaskArtifact
 
-__all__ = ['AgentClient', 'AgentCardInterpreter', 'TaskStatus', 'TaskArtifact'] 
\ No newline at end of file
+__all__ = ['AgentClient', 'RequestStatusError', 'StreamError', 'close_shared_connector', 'AgentCardInterpreter', 'TaskStatus', 'TaskArtifact'] 
\ No newline at end of file
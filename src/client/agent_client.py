@@ -3,42 +3,231 @@ A2A protocol client implementation
 """
 import aiohttp
 import asyncio
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+import orjson
+import os
+import random
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple, Union
 
 from .agent_interpreter import AgentCardInterpreter
 from .models import TaskStatus, TaskArtifact
 
+# Connectors are bound to the event loop they were created on, so the shared
+# pool is kept per loop and dropped together with it. Clients never close it:
+# whoever runs the loop calls close_shared_connector() once they are done.
+_shared_connectors: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.TCPConnector]" = weakref.WeakKeyDictionary()
+
+def get_shared_connector() -> aiohttp.TCPConnector:
+    """
+    Get the connection pool shared by every AgentClient on the running event loop
+    
+    @returns: TCPConnector with DNS caching and keep-alive enabled
+    """
+    loop = asyncio.get_running_loop()
+    connector = _shared_connectors.get(loop)
+    if connector is None or connector.closed:
+        connector = aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=100,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True,
+            keepalive_timeout=75
+        )
+        _shared_connectors[loop] = connector
+    return connector
+
+async def close_shared_connector():
+    """
+    Close the connection pool shared on the running event loop, if any
+    
+    Call it once no AgentClient on the loop is in use, e.g. before the loop
+    is shut down; a later client opens a new pool.
+    """
+    connector = _shared_connectors.pop(asyncio.get_running_loop(), None)
+    if connector is not None:
+        await connector.close()
+
+# SSE framing, matched on the raw bytes so only data frames are ever decoded
+SSE_FRAME_END = b"\n\n"
+SSE_DATA_PREFIX = b"data: "
+SSE_DATA_LINE = b"\ndata: "
+SSE_COMMENT_PREFIX = b":"
+
+# Data frames above this size are decoded off the event loop, on a small
+# dedicated pool so concurrent streams can't flood the default executor
+SSE_OFFLOAD_THRESHOLD = 4096
+_sse_decode_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="sse-decode")
+
+# Request bodies are serialized with orjson up front and sent as raw bytes
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Agent cards are static for the lifetime of a server, so when AGENT_CARD_CACHE
+# is set they are cached as raw JSON for a few minutes, keyed by base URL and
+# Unix socket path
+AGENT_CARD_TTL = 300
+# AGENT_CARD_CACHE values that enable the cache (case-insensitive)
+TRUTHY_ENV_VALUES = frozenset({"1", "true", "yes"})
+_agent_card_cache: Dict[Tuple[str, Optional[str]], Tuple[float, bytes]] = {}
+
+# Responses worth retrying when polling: rate limiting and transient server errors
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+class RequestStatusError(Exception):
+    """
+    Request answered with an unexpected HTTP status
+    
+    @param message: Error message
+    @param status: HTTP status code of the response
+    """
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+class StreamError(Exception):
+    """
+    SSE stream reported an error other than a task failure
+    
+    @param message: Error message from the event
+    @param code: JSON-RPC error code of the event
+    """
+    def __init__(self, message: str, code: Optional[int]):
+        super().__init__(message)
+        self.code = code
+
+# JSON-RPC error code the server uses for a failed task; other error codes
+# report problems with the stream itself
+TASK_FAILED_ERROR_CODE = -32500
+
+# Last formatted UTC timestamp, reused for every history entry within that second
+_utc_now_cache: List[Any] = [-1, ""]
+
+def _utc_now_iso() -> str:
+    """
+    Current UTC time in ISO 8601 format, at one-second resolution
+    
+    @returns: Naive UTC timestamp such as 2025-01-01T12:00:00
+    """
+    now = int(time.time())
+    if now != _utc_now_cache[0]:
+        _utc_now_cache[0] = now
+        _utc_now_cache[1] = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(now))
+    return _utc_now_cache[1]
+
+# Task states after which no further updates are sent
+TERMINAL_STATES = frozenset({"completed", "failed", "cancelled"})
+
+def _json_dumps(obj: Any) -> str:
+    """
+    Serialize with orjson for aiohttp's json= arguments, which expect a str
+    
+    @param obj: JSON-serializable value
+    @returns: JSON text
+    """
+    return orjson.dumps(obj).decode()
+
+def _encode_body(payload: Union[Dict[str, Any], bytes]) -> bytes:
+    """
+    Serialize a request payload, passing pre-encoded bodies through untouched
+    
+    @param payload: JSON-serializable dict or already encoded JSON bytes
+    @returns: Request body bytes
+    """
+    if isinstance(payload, (bytes, bytearray)):
+        return payload
+    return orjson.dumps(payload)
+
+async def _iter_sse_events(response: aiohttp.ClientResponse) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Split an SSE byte stream into frames and decode the data of each one
+    Only data frames are decoded; keep-alive comments and blank frames are skipped
+    
+    @param response: Open SSE response
+    @yields: Decoded JSON payload of each data frame
+    """
+    buffer = bytearray()
+    async for chunk in response.content.iter_any():
+        buffer += chunk
+        start = 0
+        with memoryview(buffer) as view:
+            while (end := buffer.find(SSE_FRAME_END, start)) != -1:
+                frame_start, start = start, end + len(SSE_FRAME_END)
+                
+                # Skip heartbeats and empty frames
+                if frame_start == end or buffer.startswith(SSE_COMMENT_PREFIX, frame_start, end):
+                    continue
+                    
+                # Locate the data line, which may follow an "event:" line
+                if buffer.startswith(SSE_DATA_PREFIX, frame_start, end):
+                    data_start = frame_start + len(SSE_DATA_PREFIX)
+                else:
+                    data_line = buffer.find(SSE_DATA_LINE, frame_start, end)
+                    if data_line == -1:
+                        continue
+                    data_start = data_line + len(SSE_DATA_LINE)
+                    
+                try:
+                    if end - data_start > SSE_OFFLOAD_THRESHOLD:
+                        # Large frames (artifacts carrying the whole script) are decoded
+                        # on a worker thread so the loop keeps serving other tasks
+                        event = await asyncio.get_running_loop().run_in_executor(
+                            _sse_decode_executor, orjson.loads, bytes(view[data_start:end])
+                        )
+                    else:
+                        event = orjson.loads(view[data_start:end])
+                except orjson.JSONDecodeError as e:
+                    raise Exception(f"Invalid SSE event data: {str(e)}")
+                yield event
+        del buffer[:start]
+
 class AgentClient:
     """
     A client that interacts with our script generator agent using A2A protocol
     
     @param base_url: Base URL of the agent service
     @param max_retries: Maximum number of status check retries
-    @param retry_delay: Delay between retries in seconds
+    @param retry_delay: Maximum delay between retries in seconds
+    @param base_delay: Delay before the first retry; it doubles on each attempt up to retry_delay
+    @param jitter: Upper bound of the random delay added to each retry, in seconds
     @param openai_api_key: OpenAI API key for intelligent interpretation
+    @param external_connector: Connection pool owned by the caller; it is never closed by the client.
+        Without one the client uses the loop's shared pool, closed with close_shared_connector()
     """
     def __init__(
         self, 
         base_url: str = "http://localhost:8000",
         max_retries: int = 40,
         retry_delay: int = 15,
-        openai_api_key: Optional[str] = None
+        openai_api_key: Optional[str] = None,
+        external_connector: Optional[aiohttp.BaseConnector] = None,
+        base_delay: float = 0.5,
+        jitter: float = 0.25
     ):
         self.base_url = base_url
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.base_delay = base_delay
+        self.jitter = jitter
+        self.external_connector = external_connector
         self.session = None
         self.interpreter = AgentCardInterpreter(openai_api_key)
         self.task_history = {}
+        self._current_state: Dict[str, str] = {}
         
     async def __aenter__(self):
-        """Initialize aiohttp session"""
-        self.session = aiohttp.ClientSession()
+        """Initialize aiohttp session on top of the external or shared connection pool"""
+        self.session = aiohttp.ClientSession(
+            connector=self.external_connector or get_shared_connector(),
+            connector_owner=False,
+            timeout=aiohttp.ClientTimeout(total=None, connect=10),
+            json_serialize=_json_dumps
+        )
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Close aiohttp session"""
+        """Close aiohttp session, leaving the connection pool open"""
         if self.session:
             await self.session.close()
             
@@ -46,22 +235,38 @@ class AgentClient:
         """
         Request the agent's card using A2A protocol
         
+        Set AGENT_CARD_CACHE=1 (or true/yes) to cache cards for AGENT_CARD_TTL seconds per
+        base URL and Unix socket; by default a fresh card is always fetched.
+        
         @returns: Agent card information
         @raises: Exception if request fails
         """
         if not self.session:
             raise Exception("Session not initialized. Use async with.")
             
+        use_cache = os.getenv("AGENT_CARD_CACHE", "").strip().lower() in TRUTHY_ENV_VALUES
+        cache_key = (self.base_url, getattr(self.external_connector, "path", None))
+        if use_cache:
+            cached = _agent_card_cache.get(cache_key)
+            if cached is not None and time.monotonic() - cached[0] < AGENT_CARD_TTL:
+                # Decode on every hit so callers never share a mutable dict
+                return orjson.loads(cached[1])
+                
         async with self.session.get(f"{self.base_url}/.well-known/agent.json") as response:
             if response.status != 200:
                 raise Exception(f"Failed to get agent card: {response.status}")
-            return await response.json()
+            body = await response.read()
             
-    async def send_task(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
+        agent_card = orjson.loads(body)
+        if use_cache:
+            _agent_card_cache[cache_key] = (time.monotonic(), body)
+        return agent_card
+            
+    async def send_task(self, task_data: Union[Dict[str, Any], bytes]) -> Dict[str, Any]:
         """
         Send a task request to the agent
         
-        @param task_data: Task parameters
+        @param task_data: Task parameters, or an already serialized JSON body
         @returns: Initial task response
         @raises: Exception if request fails
         """
@@ -70,17 +275,44 @@ class AgentClient:
             
         async with self.session.post(
             f"{self.base_url}/tasks/send",
-            json=task_data
+            data=_encode_body(task_data),
+            headers=JSON_HEADERS
         ) as response:
             if response.status != 200:
                 raise Exception(f"Failed to send task: {response.status}")
-            return await response.json()
+            return await response.json(loads=orjson.loads)
             
-    async def check_task_status(self, task_id: str) -> Dict[str, Any]:
+    async def send_task_subscribe(self, task_data: Union[Dict[str, Any], bytes]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Send a task request and stream its updates over SSE
+        
+        The stream runs on the client's pooled session, so status and cancel
+        requests can be issued while it is open.
+        
+        @param task_data: Task parameters (JSON-RPC tasks/sendSubscribe envelope),
+            or the envelope already serialized to JSON bytes
+        @yields: Decoded SSE events for the task
+        @raises: Exception if request fails
+        """
+        if not self.session:
+            raise Exception("Session not initialized. Use async with.")
+            
+        async with self.session.post(
+            f"{self.base_url}/tasks/sendSubscribe",
+            data=_encode_body(task_data),
+            headers=JSON_HEADERS
+        ) as response:
+            if response.status != 200:
+                raise Exception(f"Failed to subscribe to task: {response.status}")
+            async for event in _iter_sse_events(response):
+                yield event
+            
+    async def check_task_status(self, task_id: str, include_history: bool = False) -> Dict[str, Any]:
         """
         Check the status of a task
         
         @param task_id: ID of the task to check
+        @param include_history: Whether the server should include the task's status history
         @returns: Task status response
         @raises: Exception if request fails
         """
@@ -88,11 +320,12 @@ class AgentClient:
             raise Exception("Session not initialized. Use async with.")
             
         async with self.session.get(
-            f"{self.base_url}/tasks/{task_id}"
+            f"{self.base_url}/tasks/{task_id}",
+            params={"include_history": "true"} if include_history else None
         ) as response:
             if response.status != 200:
-                raise Exception(f"Failed to check task status: {response.status}")
-            return await response.json()
+                raise RequestStatusError(f"Failed to check task status: {response.status}", response.status)
+            return await response.json(loads=orjson.loads)
             
     async def cancel_task(self, task_id: str) -> Dict[str, Any]:
         """
@@ -110,7 +343,7 @@ class AgentClient:
         state = current_status["status"]["state"]
         
         # Can't cancel tasks in terminal states
-        if state in {"completed", "failed", "cancelled"}:
+        if state in TERMINAL_STATES:
             raise Exception(f"Cannot cancel task in {state} state")
             
         # Send cancellation request
@@ -119,7 +352,7 @@ class AgentClient:
         ) as response:
             if response.status != 200:
                 raise Exception(f"Failed to cancel task: {response.status}")
-            return await response.json()
+            return await response.json(loads=orjson.loads)
             
     async def get_task_history(self, task_id: str) -> List[Dict[str, Any]]:
         """
@@ -127,56 +360,179 @@ class AgentClient:
         
         @param task_id: ID of the task to get history for
         @returns: List of historical states and messages
-        @raises: Exception if request fails
+        @raises: Exception if the task is not found or the request fails
         """
-        if not self.session:
-            raise Exception("Session not initialized.")
-            
-        async with self.session.get(
-            f"{self.base_url}/tasks/{task_id}/history"
-        ) as response:
-            if response.status != 200:
+        try:
+            task = await self.check_task_status(task_id, include_history=True)
+        except RequestStatusError as e:
+            if e.status == 404:
                 raise Exception(f"Task {task_id} not found")
-            return await response.json()
+            raise
+        return task.get("history") or []
             
-    async def _update_task_history(self, task_id: str, status_update: Dict[str, Any]):
+    def _update_task_history(self, task_id: str, status_update: Dict[str, Any]):
         """
         Update internal task history with new status
+        Updates repeating the current state and message are not recorded again.
         
         @param task_id: ID of the task
         @param status_update: New status update to add to history
         """
-        if task_id not in self.task_history:
-            self.task_history[task_id] = []
+        history = self.task_history.setdefault(task_id, [])
+        current_state = self._current_state.get(task_id)
             
         # Validate state transition if present
         if "state" in status_update:
             new_state = status_update["state"]
-            current_state = self.task_history[task_id][-1]["state"] if self.task_history[task_id] else None
             
             if current_state == "completed":
                 raise Exception("Invalid state transition: Cannot update completed task")
                 
+            # Skip identical back-to-back updates, e.g. repeated polls of a working task
+            if new_state == current_state and status_update.get("message") == history[-1].get("message"):
+                return
+                
+            self._current_state[task_id] = new_state
+                
         # Add timestamp if not present
         if "timestamp" not in status_update:
-            status_update["timestamp"] = datetime.utcnow().isoformat()
+            status_update["timestamp"] = _utc_now_iso()
             
-        self.task_history[task_id].append(status_update)
+        history.append(status_update)
+    
+    async def stream_task_status(self, task_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream the status updates of an existing task over SSE
+        
+        The server reports a failed task as an error event with code
+        TASK_FAILED_ERROR_CODE, which is yielded as a "failed" status update.
+        The stream ends after a terminal state.
+        
+        @param task_id: ID of the task to follow
+        @yields: Status update events (id, status, final and, once completed, artifacts)
+        @raises: RequestStatusError if the subscription is refused
+        @raises: StreamError on any other error event, e.g. a streaming failure
+        """
+        if not self.session:
+            raise Exception("Session not initialized. Use async with.")
+            
+        async with self.session.get(
+            f"{self.base_url}/tasks/{task_id}/subscribe"
+        ) as response:
+            if response.status != 200:
+                raise RequestStatusError(f"Failed to subscribe to task: {response.status}", response.status)
+            async for event in _iter_sse_events(response):
+                if "error" in event:
+                    error = event["error"]
+                    if error.get("code") != TASK_FAILED_ERROR_CODE:
+                        raise StreamError(error.get("message", ""), error.get("code"))
+                    event = {
+                        "id": task_id,
+                        "status": {
+                            "state": "failed",
+                            "message": {
+                                "role": "agent",
+                                "parts": [{"type": "text", "text": error.get("message", "")}]
+                            }
+                        },
+                        "final": True
+                    }
+                if "status" not in event:
+                    continue
+                yield event
+                if event["status"].get("state") in TERMINAL_STATES:
+                    return
+            
+    async def stream_until_terminal(self, task_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Follow a task's SSE stream until it reaches a terminal state
+        
+        Status updates are recorded in the task history as they arrive.
+        
+        @param task_id: ID of the task to follow
+        @param timeout: Seconds to wait for a terminal state (None waits forever)
+        @returns: Terminal status update event, or None if the server has no subscribe
+            endpoint or the stream reported an error before a terminal state
+        @raises: Exception if the stream ends early or the timeout expires
+        """
+        if not self.session:
+            raise Exception("Session not initialized. Use async with.")
+            
+        terminal = asyncio.Event()
+        final_event: Dict[str, Any] = {}
+        
+        async def follow() -> bool:
+            try:
+                async with aclosing(self.stream_task_status(task_id)) as updates:
+                    async for event in updates:
+                        status = event["status"]
+                        self._update_task_history(task_id, status)
+                        if status.get("state") in TERMINAL_STATES:
+                            final_event.update(event)
+                            terminal.set()
+                            break
+            except RequestStatusError as e:
+                if e.status in (404, 405):
+                    return False
+                raise
+            except StreamError:
+                # The task may still be running; let the caller poll instead
+                return False
+            return True
+        
+        reader = asyncio.create_task(follow())
+        try:
+            waiter = asyncio.create_task(terminal.wait())
+            done, _ = await asyncio.wait({reader, waiter}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+            if terminal.is_set():
+                return final_event
+            if not done:
+                raise Exception(f"Task did not reach a terminal state within {timeout} seconds")
+            if not reader.result():
+                return None
+            raise Exception("Task stream closed before reaching a terminal state")
+        finally:
+            reader.cancel()
     
     async def wait_for_completion(self, task_id: str) -> Dict[str, Any]:
         """
-        Wait for task completion with retries
+        Wait for task completion, following the server's SSE stream
+        
+        Falls back to polling with exponential backoff and jitter, capped at
+        retry_delay, when the server has no subscribe endpoint or the stream
+        reports an error other than a task failure; 429 and 5xx
+        responses are retried. The stream is bounded by max_retries * retry_delay.
         
         @param task_id: ID of the task to monitor
         @returns: Final task result
         @raises: Exception if task fails or timeout
         """
+        final_event = await self.stream_until_terminal(
+            task_id, timeout=self.max_retries * self.retry_delay
+        )
+        if final_event is not None:
+            state = final_event["status"]["state"]
+            if state == "completed":
+                return await self.check_task_status(task_id)
+            elif state == "failed":
+                error_msg = final_event["status"]["message"]["parts"][0]["text"]
+                raise Exception(f"Task failed: {error_msg}")
+            raise Exception("Task was cancelled")
+        
         for attempt in range(self.max_retries):
-            task_status = await self.check_task_status(task_id)
+            delay = min(self.retry_delay, self.base_delay * 2 ** attempt) + random.uniform(0, self.jitter)
+            try:
+                task_status = await self.check_task_status(task_id)
+            except RequestStatusError as e:
+                if e.status not in RETRYABLE_STATUSES:
+                    raise
+                await asyncio.sleep(delay)
+                continue
             state = task_status["status"]["state"]
             
             # Update task history
-            await self._update_task_history(task_id, task_status["status"])
+            self._update_task_history(task_id, task_status["status"])
             
             if state == "completed":
                 return task_status
@@ -186,6 +542,6 @@ class AgentClient:
             elif state == "cancelled":
                 raise Exception("Task was cancelled")
                 
-            await asyncio.sleep(self.retry_delay)
+            await asyncio.sleep(delay)
             
-        raise Exception(f"Task did not complete after {self.max_retries} retries") 
\ No newline at end of file
+        raise Exception(f"Task did not complete after {self.max_retries} retries") 
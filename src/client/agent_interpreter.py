@@ -1,53 +1,207 @@
 """
 Interpreter for A2A protocol agent cards using OpenAI
 """
-import json
+import atexit
+import hashlib
 import os
-from typing import Dict, Any, Optional
+import re
+import sqlite3
+import time
+import orjson
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
 from openai import AsyncOpenAI
 
+# Markdown code fence (optionally tagged json) wrapped around a model reply
+CODE_FENCE_RE = re.compile(r"^(?:```)?(?:json)?[ \t]*\n(.*?)\s*(?:```)?$", re.DOTALL)
+
+# Fixed prompt text for create_task_data; keep it free of per-call values so
+# the prompt prefix stays cacheable on the OpenAI side
+TASK_DATA_SYSTEM_PROMPT = (
+    "You are a helpful assistant that creates valid API inputs to achieve specific goals. "
+    "Only respond with raw JSON data, no markdown or explanations."
+)
+TASK_DATA_INSTRUCTIONS = """You are an AI tasked with creating valid input data for an agent.
+
+Create a task input that:
+1. Follows exactly the structure required by the agent (based on the agent card)
+2. Contains appropriate values that will help achieve our goal
+3. Includes all required fields with valid data types
+
+Important: Respond ONLY with the raw JSON data, no markdown formatting or explanation."""
+
+TASK_DATA_MODEL = "gpt-4o-mini"
+
+# Fingerprint of the prompt and model, part of every cache key so task data
+# generated with an older prompt is never served for the current one
+TASK_DATA_PROMPT_DIGEST = hashlib.sha256(
+    "\0".join((TASK_DATA_SYSTEM_PROMPT, TASK_DATA_INSTRUCTIONS, TASK_DATA_MODEL)).encode()
+).hexdigest()
+
+# Generated task data keyed by (prompt digest, canonical agent card, goal),
+# shared by every interpreter in the process so repeated requests skip the
+# OpenAI round-trip
+TASK_DATA_CACHE_SIZE = 32
+_task_data_cache: Dict[Tuple[str, bytes, str], bytes] = {}
+
+# Seconds a store waits for another process to release the database lock;
+# kept short since stores are used from the event loop, and a locked
+# database is treated as a cache miss instead
+TASK_DATA_DB_TIMEOUT = 0.1
+
+class _TaskDataCache:
+    """
+    SQLite store persisting generated task data across runs
+    
+    @param path: Database file, created on first use
+    """
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Several test workers may share the file: wait briefly on locks, and
+        # let readers proceed while one of them writes
+        self.db = sqlite3.connect(path, timeout=TASK_DATA_DB_TIMEOUT)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS task_data "
+            "(key TEXT PRIMARY KEY, value BLOB, created_at REAL)"
+        )
+        
+    def close(self):
+        """Close the database connection"""
+        self.db.close()
+        
+    @staticmethod
+    def digest(key: Tuple[str, bytes, str]) -> str:
+        """
+        Hash a cache key into the stored primary key
+        
+        @param key: Prompt digest, canonical agent card and goal
+        @returns: Hex SHA-256 of the prompt digest, card and goal
+        """
+        prompt_digest, card_json, goal = key
+        return hashlib.sha256(
+            prompt_digest.encode() + b"\0" + card_json + b"\0" + goal.encode()
+        ).hexdigest()
+        
+    def get(self, key: Tuple[str, bytes, str]) -> Optional[bytes]:
+        """
+        Look up stored task data
+        
+        @param key: Prompt digest, canonical agent card and goal
+        @returns: Task data as JSON bytes, or None on a miss or a locked database
+        """
+        try:
+            row = self.db.execute(
+                "SELECT value FROM task_data WHERE key = ?", (self.digest(key),)
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return row[0] if row else None
+        
+    def put(self, key: Tuple[str, bytes, str], content: bytes):
+        """
+        Store task data, replacing any previous entry; skipped if another
+        process holds the database lock
+        
+        @param key: Prompt digest, canonical agent card and goal
+        @param content: Task data as JSON bytes
+        """
+        try:
+            with self.db:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO task_data (key, value, created_at) VALUES (?, ?, ?)",
+                    (self.digest(key), content, time.time())
+                )
+        except sqlite3.OperationalError:
+            pass
+
+# One store per database file, shared by every interpreter in the process
+_task_data_stores: Dict[Path, _TaskDataCache] = {}
+
+def get_task_data_store(cache_dir: str) -> _TaskDataCache:
+    """
+    Get the task data store for a cache directory, opening it on first use
+    
+    @param cache_dir: Directory holding the SQLite file
+    @returns: Store shared by every interpreter using that directory
+    """
+    path = (Path(cache_dir) / "task_data.sqlite").resolve()
+    store = _task_data_stores.get(path)
+    if store is None:
+        store = _task_data_stores[path] = _TaskDataCache(path)
+    return store
+
+@atexit.register
+def _close_task_data_stores():
+    """Close every open task data store when the process exits"""
+    while _task_data_stores:
+        _task_data_stores.popitem()[1].close()
+
 class AgentCardInterpreter:
     """
     Interprets the AgentCard using OpenAI to understand input/output requirements and adapt our goals
     
     @param api_key: OpenAI API key
+    @param cache_dir: Directory where generated task data is persisted across runs
+        (defaults to TASK_DATA_CACHE_DIR; disabled when unset)
     """
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache_dir: Optional[str] = None):
         self.client = AsyncOpenAI(api_key=api_key or os.getenv('OPENAI_API_KEY'))
+        cache_dir = cache_dir or os.getenv('TASK_DATA_CACHE_DIR')
+        self.store = get_task_data_store(cache_dir) if cache_dir else None
+        
+    def _store(self, key: Tuple[str, bytes, str], content: bytes, persist: bool = True):
+        """
+        Remember generated task data in memory and, if enabled, on disk
+        
+        @param key: Prompt digest, canonical agent card and goal
+        @param content: Task data as JSON bytes
+        @param persist: Whether to also write it to the SQLite store
+        """
+        if len(_task_data_cache) >= TASK_DATA_CACHE_SIZE:
+            del _task_data_cache[next(iter(_task_data_cache))]
+        _task_data_cache[key] = content
+        
+        if persist and self.store is not None:
+            self.store.put(key, content)
         
     async def create_task_data(self, agent_card: Dict[str, Any], goal: str) -> Dict[str, Any]:
         """
         Analyze the agent card and create task data that matches both the required structure
         and our specific goal
         
+        Results are cached per (prompt, agent card, goal), so OpenAI is only called on a miss.
+        
         @param agent_card: The agent card to analyze
         @param goal: Our specific goal for the task
         @returns: Dictionary with properly structured task data
         @raises: Exception if interpretation fails
         """
+        # Serialized once: canonical (sorted) for the cache key, indented for the prompt
+        card_json = orjson.dumps(agent_card, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+        key = (TASK_DATA_PROMPT_DIGEST, card_json, goal)
+        cached = _task_data_cache.get(key)
+        if cached is None and self.store is not None:
+            cached = self.store.get(key)
+            if cached is not None:
+                self._store(key, cached, persist=False)
+        if cached is not None:
+            # Decode on every hit so callers never share a mutable dict
+            return orjson.loads(cached)
+            
         try:
-            # Create a prompt for OpenAI to analyze the agent card and create appropriate task data
-            prompt = f"""
-            You are an AI tasked with creating valid input data for an agent.
-
-            The agent's card specification is:
-            {json.dumps(agent_card, indent=2)}
-
-            The goal we want to achieve is:
-            {goal}
-
-            Create a task input that:
-            1. Follows exactly the structure required by the agent (based on the agent card)
-            2. Contains appropriate values that will help achieve our goal
-            3. Includes all required fields with valid data types
-
-            Important: Respond ONLY with the raw JSON data, no markdown formatting or explanation.
-            """
+            # Static text first and the goal last, so repeated calls for the same
+            # card share a byte-identical prefix that OpenAI can serve from its prompt cache
+            prompt = (
+                f"{TASK_DATA_INSTRUCTIONS}\n\n"
+                f"The agent's card specification is:\n{card_json.decode()}\n\n"
+                f"The goal we want to achieve is:\n{goal}"
+            )
             
             response = await self.client.chat.completions.create(
-                model="gpt-4o-mini",
+                model=TASK_DATA_MODEL,
                 messages=[
-                    {"role": "system", "content": "You are a helpful assistant that creates valid API inputs to achieve specific goals. Only respond with raw JSON data, no markdown or explanations."},
+                    {"role": "system", "content": TASK_DATA_SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.1
@@ -57,13 +211,13 @@ class AgentCardInterpreter:
             content = response.choices[0].message.content.strip()
             
             # Remove markdown code block indicators if present
-            if content.startswith('```'):
-                content = '\n'.join(content.split('\n')[1:-1])
-            if content.startswith('json'):
-                content = '\n'.join(content.split('\n')[1:])
+            fenced = CODE_FENCE_RE.match(content)
+            if fenced:
+                content = fenced.group(1)
                 
             # Parse the cleaned response into a dictionary
-            task_data = json.loads(content)
+            task_data = orjson.loads(content)
+            self._store(key, orjson.dumps(task_data))
             return task_data
             
         except Exception as e:
@@ -91,6 +91,7 @@ class A2AController:
                 "duration": duration
             }
         )
+        task.history = [task.status]
         # Store task
         self.tasks[task_id] = task
         # Start background processing
@@ -108,14 +109,14 @@ class A2AController:
         """Process task in background."""
         try:
             # Update status to working
-            task.status = TaskStatus(
+            self._set_status(task, TaskStatus(
                 state=TaskState.WORKING,
                 timestamp=datetime.utcnow().isoformat(),
                 message=Message(
                     role="agent",
                     parts=[TextPart(type="text", text="Generating movie script...")]
                 )
-            )
+            ))
 
             # Log task started
             logger.log_script_generation(
@@ -181,14 +182,14 @@ class A2AController:
                 ]
                 
                 # Update task with completion status
-                task.status = TaskStatus(
+                self._set_status(task, TaskStatus(
                     state=TaskState.COMPLETED,
                     timestamp=datetime.utcnow().isoformat(),
                     message=Message(
                         role="agent",
                         parts=[TextPart(type="text", text=f"Successfully generated script for '{request.title}'")]
                     )
-                )
+                ))
                 
                 # Log completion
                 logger.log_script_generation(
@@ -201,14 +202,14 @@ class A2AController:
                 error_message = f"Failed to generate script: {str(e)}"
                 
                 # Update task with error status
-                task.status = TaskStatus(
+                self._set_status(task, TaskStatus(
                     state=TaskState.FAILED,
                     timestamp=datetime.utcnow().isoformat(),
                     message=Message(
                         role="agent",
                         parts=[TextPart(type="text", text=error_message)]
                     )
-                )
+                ))
                 
                 # Log error
                 logger.log_script_generation(
@@ -224,14 +225,14 @@ class A2AController:
             error_message = f"Task processing failed: {str(e)}"
             
             # Update task with error status
-            task.status = TaskStatus(
+            self._set_status(task, TaskStatus(
                 state=TaskState.FAILED,
                 timestamp=datetime.utcnow().isoformat(),
                 message=Message(
                     role="agent",
                     parts=[TextPart(type="text", text=error_message)]
                 )
-            )
+            ))
             
             # Log error
             logger.log_script_generation(
@@ -243,6 +244,13 @@ class A2AController:
                 }
             )
 
+    def _set_status(self, task: Task, status: TaskStatus):
+        """Set a task's status and record it in the task history."""
+        task.status = status
+        if task.history is None:
+            task.history = []
+        task.history.append(status)
+
     async def get_task(self, task_id: str) -> Task:
         """Get the current state of a task."""
         if task_id not in self.tasks:
@@ -258,14 +266,14 @@ class A2AController:
         if task.status.state in [TaskState.COMPLETED, TaskState.FAILED, TaskState.CANCELLED]:
             raise HTTPException(status_code=400, detail="Task already finished")
         
-        task.status = TaskStatus(
+        self._set_status(task, TaskStatus(
             state=TaskState.CANCELLED,
             timestamp=datetime.utcnow().isoformat(),
             message=Message(
                 role="agent",
                 parts=[TextPart(type="text", text="Task cancelled by user request")]
             )
-        )
+        ))
 
         # Log cancellation
         logger.log_script_generation(
@@ -375,6 +383,130 @@ class A2AController:
         event = SSEKeepAliveEvent(timestamp=datetime.utcnow().isoformat())
         return event.format_sse()
 
+    async def _task_event_stream(self, task: Task):
+        """Generate SSE events for a task until it reaches a terminal state."""
+        try:
+            last_state = task.status.state
+            if last_state in (TaskState.FAILED, TaskState.CANCELLED):
+                # Already finished (re-subscription): let the loop emit its terminal event
+                last_state = None
+            else:
+                # Initial status update
+                yield self._create_status_update_event(task)
+            
+            had_error = False
+            sent_final_update = False
+            
+            # Keep track of last activity time for keep-alive messages
+            last_activity = time.time()
+            
+            while True:
+                current_time = time.time()
+                current_task = self.tasks.get(task.id)
+                
+                if not current_task:
+                    # Task not found, send error and break
+                    yield self._create_error_event(
+                        task_id=task.id, 
+                        code=-32000, 
+                        message="Task not found",
+                        details="Task may have been deleted"
+                    )
+                    break
+                
+                # Send a keep-alive comment every 15 seconds if no other activity
+                if current_time - last_activity > 15:
+                    yield self._create_keep_alive_event()
+                    last_activity = current_time
+                    continue
+                
+                # Check for state changes
+                current_state = current_task.status.state
+                state_changed = current_state != last_state
+                
+                if state_changed:
+                    # State changed, send a status update
+                    last_state = current_state
+                    last_activity = current_time
+                    
+                    # Check if task failed
+                    if current_state == TaskState.FAILED:
+                        # Send error event for failed tasks
+                        error_message = "Task processing failed"
+                        if current_task.status.message and current_task.status.message.parts:
+                            for part in current_task.status.message.parts:
+                                if hasattr(part, 'text'):
+                                    error_message = part.text
+                                    break
+                        
+                        yield self._create_error_event(
+                            task_id=task.id,
+                            code=-32500,
+                            message=error_message
+                        )
+                        had_error = True
+                        break
+                    
+                    # For completed states, only send the update if we have the artifacts
+                    # Otherwise, wait for the artifacts to be available
+                    if current_state == TaskState.COMPLETED and not current_task.artifacts:
+                        # Do not send the update until we have the artifacts
+                        pass
+                    elif current_state == TaskState.CANCELLED:
+                        # For cancelled states, send the final status update immediately
+                        yield self._create_status_update_event(current_task, final=True)
+                        sent_final_update = True
+                        break
+                    elif current_state != TaskState.COMPLETED:
+                        # For other states that are not completed, send the normal update
+                        yield self._create_status_update_event(current_task, final=False)
+                
+                # If the state is completed and we have artifacts, first send an artifact event
+                # followed by the final status_update with the artifacts included
+                if current_state == TaskState.COMPLETED and current_task.artifacts and not sent_final_update:
+                    # First send the artifact as a separate event
+                    yield self._create_artifact_event(current_task)
+                    
+                    # Then send the final status with the artifacts included
+                    yield self._create_status_update_event(current_task, final=True)
+                    
+                    sent_final_update = True
+                    last_activity = current_time
+                    break
+                
+                # Wait before checking again
+                await asyncio.sleep(0.5)
+        except Exception as e:
+            # Capture errors during streaming and send as A2A error event
+            error_message = f"Error during streaming: {str(e)}"
+            logger.log_script_generation(
+                task_id=task.id if task else "unknown",
+                status="streaming_error",
+                metadata={"error": error_message}
+            )
+            yield self._create_error_event(
+                task_id=task.id if task else "unknown",
+                code=-32000,
+                message=error_message
+            )
+
+    async def subscribe_task(self, task_id: str) -> StreamingResponse:
+        """
+        Stream updates for an existing task until it reaches a terminal state.
+        """
+        if task_id not in self.tasks:
+            raise HTTPException(status_code=404, detail="Task not found")
+        
+        return StreamingResponse(
+            self._task_event_stream(self.tasks[task_id]),
+            media_type="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+                "X-Accel-Buffering": "no"
+            }
+        )
+
     async def send_task_streaming(self, request: TaskRequest) -> StreamingResponse:
         """
         Create and process a new task with streaming updates.
@@ -406,111 +538,8 @@ class A2AController:
                 sessionId=request.sessionId
             )
             
-            async def event_stream():
-                """Generate SSE events for task updates."""
-                try:
-                    # Initial status update
-                    yield self._create_status_update_event(task)
-                    
-                    last_state = task.status.state
-                    had_error = False
-                    sent_final_update = False
-                    
-                    # Keep track of last activity time for keep-alive messages
-                    last_activity = time.time()
-                    
-                    while True:
-                        current_time = time.time()
-                        current_task = self.tasks.get(task.id)
-                        
-                        if not current_task:
-                            # Task not found, send error and break
-                            yield self._create_error_event(
-                                task_id=task.id, 
-                                code=-32000, 
-                                message="Task not found",
-                                details="Task may have been deleted"
-                            )
-                            break
-                        
-                        # Send a keep-alive comment every 15 seconds if no other activity
-                        if current_time - last_activity > 15:
-                            yield self._create_keep_alive_event()
-                            last_activity = current_time
-                            continue
-                        
-                        # Check for state changes
-                        current_state = current_task.status.state
-                        state_changed = current_state != last_state
-                        
-                        if state_changed:
-                            # State changed, send a status update
-                            last_state = current_state
-                            last_activity = current_time
-                            
-                            # Check if task failed
-                            if current_state == TaskState.FAILED:
-                                # Send error event for failed tasks
-                                error_message = "Task processing failed"
-                                if current_task.status.message and current_task.status.message.parts:
-                                    for part in current_task.status.message.parts:
-                                        if hasattr(part, 'text'):
-                                            error_message = part.text
-                                            break
-                                
-                                yield self._create_error_event(
-                                    task_id=task.id,
-                                    code=-32500,
-                                    message=error_message
-                                )
-                                had_error = True
-                                break
-                            
-                            # For completed states, only send the update if we have the artifacts
-                            # Otherwise, wait for the artifacts to be available
-                            if current_state == TaskState.COMPLETED and not current_task.artifacts:
-                                # Do not send the update until we have the artifacts
-                                pass
-                            elif current_state == TaskState.CANCELLED:
-                                # For cancelled states, send the final status update immediately
-                                yield self._create_status_update_event(current_task, final=True)
-                                sent_final_update = True
-                                break
-                            elif current_state != TaskState.COMPLETED:
-                                # For other states that are not completed, send the normal update
-                                yield self._create_status_update_event(current_task, final=False)
-                        
-                        # If the state is completed and we have artifacts, first send an artifact event
-                        # followed by the final status_update with the artifacts included
-                        if current_state == TaskState.COMPLETED and current_task.artifacts and not sent_final_update:
-                            # First send the artifact as a separate event
-                            yield self._create_artifact_event(current_task)
-                            
-                            # Then send the final status with the artifacts included
-                            yield self._create_status_update_event(current_task, final=True)
-                            
-                            sent_final_update = True
-                            last_activity = current_time
-                            break
-                        
-                        # Wait before checking again
-                        await asyncio.sleep(0.5)
-                except Exception as e:
-                    # Capture errors during streaming and send as A2A error event
-                    error_message = f"Error during streaming: {str(e)}"
-                    logger.log_script_generation(
-                        task_id=task.id if task else "unknown",
-                        status="streaming_error",
-                        metadata={"error": error_message}
-                    )
-                    yield self._create_error_event(
-                        task_id=task.id if task else "unknown",
-                        code=-32000,
-                        message=error_message
-                    )
-                
             return StreamingResponse(
-                event_stream(),
+                self._task_event_stream(task),
                 media_type="text/event-stream",
                 headers={
                     "Cache-Control": "no-cache",
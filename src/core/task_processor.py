@@ -218,6 +218,9 @@ class TaskProcessor:
         output_mode = task.acceptedOutputModes[0]
         
         try:
+            # Keep the request message before the status is replaced
+            message = task.status.message
+            
             # Update to working state
             task.status = self._create_status_update(
                 TaskState.WORKING,
@@ -233,7 +236,6 @@ class TaskProcessor:
                 session_context = self._get_session_context(task.sessionId)["context"]
             
             # Process the message
-            message = task.status.message
             if not message or not message.parts:
                 raise ValueError("No message content provided")
             
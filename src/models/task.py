@@ -3,7 +3,7 @@ Task-related models for A2A protocol
 """
 from typing import Dict, Any, Optional, List, Union
 from enum import Enum
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 class TaskState(str, Enum):
@@ -112,6 +112,8 @@ class Task(BaseModel):
     status: TaskStatus
     artifacts: Optional[List[Artifact]] = None
     metadata: Optional[Dict[str, Any]] = None
+    acceptedOutputModes: List[str] = Field(default_factory=lambda: ["text"])
+    history: List[Message] = Field(default_factory=list)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
@@ -136,7 +138,8 @@ class Task(BaseModel):
                 timestamp=datetime.utcnow().isoformat(),
                 message=Message(**params.message) if isinstance(params.message, dict) else params.message
             ),
-            metadata=params.metadata
+            metadata=params.metadata,
+            acceptedOutputModes=params.acceptedOutputModes or ["text"]
         )
 
 class PushNotificationConfig(BaseModel):
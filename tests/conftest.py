@@ -4,7 +4,6 @@ Test fixtures for API tests
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import MagicMock, AsyncMock
-from datetime import datetime
 import asyncio
 from src.api.app import app
 from src.core.generator import MovieScriptGenerator
@@ -13,8 +12,16 @@ from src.models.a2a import Task, TaskSendParams
 import os
 from dotenv import load_dotenv
 
-# Load environment variables from .env file at the start of testing
-load_dotenv()
+# Fixed status timestamp for test tasks; no test checks the time itself
+FIXED_TIMESTAMP = "2024-01-01T00:00:00"
+
+@pytest.fixture(scope="session", autouse=True)
+def load_env():
+    """
+    Load environment variables from the .env file once per test session.
+    """
+    load_dotenv()
+    yield
 
 @pytest.fixture
 def test_client():
@@ -66,7 +73,7 @@ def mock_task_processor():
             id=task_id,
             status=TaskStatus(
                 state=TaskState.COMPLETED,
-                timestamp=datetime.utcnow().isoformat(),
+                timestamp=FIXED_TIMESTAMP,
                 message=Message(
                     role="assistant",
                     parts=[TextPart(type="text", text="Task completed")]
@@ -92,7 +99,7 @@ def mock_task_processor():
             await asyncio.sleep(0.1)  # Small delay to simulate processing
             task.status = TaskStatus(
                 state=TaskState.WORKING,
-                timestamp=datetime.utcnow().isoformat(),
+                timestamp=FIXED_TIMESTAMP,
                 message=Message(
                     role="assistant",
                     parts=[TextPart(type="text", text="Generating movie script...")]
@@ -101,7 +108,7 @@ def mock_task_processor():
             await asyncio.sleep(0.1)  # Small delay to simulate completion
             task.status = TaskStatus(
                 state=TaskState.COMPLETED,
-                timestamp=datetime.utcnow().isoformat(),
+                timestamp=FIXED_TIMESTAMP,
                 message=Message(
                     role="assistant",
                     parts=[TextPart(type="text", text="Movie script generated successfully")]
@@ -134,7 +141,7 @@ def mock_task_processor():
             sessionId=task.sessionId,
             status=TaskStatus(
                 state=TaskState.WORKING,
-                timestamp=datetime.utcnow().isoformat(),
+                timestamp=FIXED_TIMESTAMP,
                 message=Message(
                     role="assistant",
                     parts=[TextPart(type="text", text="Generating movie script...")]
@@ -151,7 +158,7 @@ def mock_task_processor():
             sessionId=task.sessionId,
             status=TaskStatus(
                 state=TaskState.COMPLETED,
-                timestamp=datetime.utcnow().isoformat(),
+                timestamp=FIXED_TIMESTAMP,
                 message=Message(
                     role="assistant",
                     parts=[TextPart(type="text", text="Movie script generated successfully")]
@@ -197,7 +204,7 @@ def mock_task_processor():
             sessionId=task.sessionId,
             status=TaskStatus(
                 state=TaskState.FAILED,
-                timestamp=datetime.utcnow().isoformat(),
+                timestamp=FIXED_TIMESTAMP,
                 message=Message(
                     role="assistant",
                     parts=[TextPart(type="text", text="Failed to generate movie script: Invalid parameters provided")]
@@ -2,20 +2,53 @@
 Pytest configuration for end-to-end tests
 """
 import pytest
+import pytest_asyncio
 import asyncio
 import uvicorn
 import multiprocessing
 import time
+import os
+from pathlib import Path
 from src.api.app import app
+from src.client.agent_client import get_shared_connector, close_shared_connector
+
+@pytest.fixture(scope="session", autouse=True)
+def client_cache_env():
+    """
+    Enable the client-side caches for the e2e session only, restoring the
+    previous environment afterwards so other test modules are unaffected
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        # Persist interpreter-generated task data so re-runs skip the OpenAI call
+        if "TASK_DATA_CACHE_DIR" not in os.environ:
+            mp.setenv("TASK_DATA_CACHE_DIR", str(Path(__file__).resolve().parent.parent / ".cache"))
+        # The test servers never change their agent card, so clients may reuse it
+        if "AGENT_CARD_CACHE" not in os.environ:
+            mp.setenv("AGENT_CARD_CACHE", "1")
+        yield
+
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    """
+    Run the e2e tests, and the servers they start on the test loop, on
+    uvloop where it is installed (it has no Windows build)
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.DefaultEventLoopPolicy()
+    return uvloop.EventLoopPolicy()
 
 def run_server():
     """Run the FastAPI server"""
     uvicorn.run(app, host="0.0.0.0", port=8000)
 
-@pytest.fixture(scope="session", autouse=True)
+@pytest.fixture(scope="session")
 def server_fixture():
     """
-    Fixture to start and stop the FastAPI server
+    Fixture to start and stop the FastAPI server on port 8000
+    Opt-in: TestClient-based tests dispatch to the app in-process and the
+    aiohttp tests start their own servers
     """
     # Start server in a separate process
     server_process = multiprocessing.Process(target=run_server)
@@ -28,4 +61,16 @@ def server_fixture():
     
     # Stop server
     server_process.terminate()
-    server_process.join() 
\ No newline at end of file
+    server_process.join() 
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def connector():
+    """
+    Fixture providing one aiohttp connection pool for the whole test session
+    Tests using it must run on the session event loop
+    """
+    connector = get_shared_connector()
+    
+    yield connector
+    
+    await close_shared_connector()
@@ -2,13 +2,13 @@
 End-to-end tests for the A2A protocol client implementation
 """
 import asyncio
-import json
+import orjson
 from typing import Dict, Optional, Any, List
 import logging
 import os
 from datetime import datetime
 import pytest
-from dotenv import load_dotenv
+from jsonschema import Draft7Validator
 import requests
 import uvicorn
 import threading
@@ -17,13 +17,37 @@ import time
 from src.client import AgentClient, AgentCardInterpreter
 from src.api.app import app
 
-# Load environment variables from .env file
-load_dotenv()
-
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+VALID_STATES = frozenset({"submitted", "working", "input-required", "completed", "failed", "cancelled"})
+TERMINAL_STATES = frozenset({"completed", "failed", "cancelled"})
+
+# Schema for entries in AgentClient.task_history, checked once per entry
+HISTORY_ENTRY_SCHEMA = {
+    "type": "object",
+    "required": ["timestamp", "state"],
+    "properties": {
+        "timestamp": {"type": "string"},
+        "state": {"enum": sorted(VALID_STATES)},
+        "message": {
+            "type": "object",
+            "required": ["parts"],
+            "properties": {
+                "parts": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {"text": {"type": "string"}}
+                    }
+                }
+            }
+        }
+    }
+}
+HISTORY_ENTRY_VALIDATOR = Draft7Validator(HISTORY_ENTRY_SCHEMA)
+
 def is_server_running():
     """
     * Check if the server is already running
@@ -73,12 +97,12 @@ def server_process():
     yield
     # No need to cleanup as we're using daemon threads
 
-@pytest.mark.asyncio
-async def test_task_history_tracking(server_process):
+@pytest.mark.asyncio(loop_scope="session")
+async def test_task_history_tracking(server_process, connector):
     """
     Test that task history follows A2A protocol state transitions and structure
     """
-    async with AgentClient(base_url="http://localhost:8002") as client:
+    async with AgentClient(base_url="http://localhost:8002", external_connector=connector) as client:
         # Get agent card first
         agent_card = await client.get_agent_card()
         
@@ -87,7 +111,7 @@ async def test_task_history_tracking(server_process):
             agent_card,
             "Write a short comedy script about a misunderstanding at a coffee shop"
         )
-        print("task_data generado:", json.dumps(task_data, indent=2))
+        print("task_data generado:", orjson.dumps(task_data, option=orjson.OPT_INDENT_2).decode())
         envelope = {
             "jsonrpc": "2.0",
             "id": 1,
@@ -112,7 +136,7 @@ async def test_task_history_tracking(server_process):
                 }
             }
         }
-        print("Envelope enviado:", json.dumps(envelope, indent=2))
+        print("Envelope enviado:", orjson.dumps(envelope, option=orjson.OPT_INDENT_2).decode())
         task_response = await client.send_task(envelope)
         task_id = task_response["id"]
         
@@ -127,32 +151,16 @@ async def test_task_history_tracking(server_process):
             
             # Verify A2A protocol state transitions
             states = [entry["state"] for entry in history]
-            valid_states = {"submitted", "working", "input-required", "completed", "failed", "cancelled"}
-            assert all(state in valid_states for state in states), \
-                f"All states should be valid A2A states: {valid_states}"
+            assert VALID_STATES.issuperset(states), \
+                f"All states should be valid A2A states: {sorted(VALID_STATES)}"
             
             # Verify history entry structure according to A2A
             for entry in history:
-                # Required fields
-                assert "timestamp" in entry, "Each entry should have a timestamp"
-                assert "state" in entry, "Each entry should have a state"
-                assert isinstance(entry["timestamp"], str), "Timestamp should be ISO format string"
-                assert entry["state"] in valid_states, f"State should be one of: {valid_states}"
-                
-                # Optional message field - verify A2A format if present
-                if "message" in entry:
-                    message = entry["message"]
-                    assert isinstance(message, dict), "Message should be a dictionary"
-                    assert "parts" in message, "Message should have parts array"
-                    assert isinstance(message["parts"], list), "Message parts should be a list"
-                    for part in message["parts"]:
-                        assert isinstance(part, dict), "Each part should be a dictionary"
-                        if "text" in part:
-                            assert isinstance(part["text"], str), "Text in part should be a string"
+                HISTORY_ENTRY_VALIDATOR.validate(entry)
             
             # Verify final state is terminal
             final_state = history[-1]["state"]
-            assert final_state in {"completed", "failed", "cancelled"}, \
+            assert final_state in TERMINAL_STATES, \
                 "Task should end in a terminal state"
             
             # Verify state transitions are logical
@@ -166,16 +174,16 @@ async def test_task_history_tracking(server_process):
                         "Task can't return to submitted state"
                 
                 # Can't go back to working after completion
-                if prev_state in {"completed", "failed", "cancelled"}:
-                    assert curr_state in {"completed", "failed", "cancelled"}, \
+                if prev_state in TERMINAL_STATES:
+                    assert curr_state in TERMINAL_STATES, \
                         "Task can't return to working after terminal state"
             
         except Exception as e:
             logger.error(f"Task failed: {str(e)}")
             raise
 
-@pytest.mark.asyncio
-async def test_history_error_handling(server_process):
+@pytest.mark.asyncio(loop_scope="session")
+async def test_history_error_handling(server_process, connector):
     """
     Test error handling for history-related operations according to A2A protocol
     """
@@ -186,17 +194,17 @@ async def test_history_error_handling(server_process):
     assert "Session not initialized" in str(exc_info.value)
     
     # Test non-existent task ID
-    async with AgentClient(base_url="http://localhost:8002") as client:
+    async with AgentClient(base_url="http://localhost:8002", external_connector=connector) as client:
         task_id = "non-existent-task"
         with pytest.raises(Exception) as exc_info:
             await client.get_task_history(task_id)
         assert f"Task {task_id} not found" in str(exc_info.value)
         
     # Test invalid state transitions
-    async with AgentClient(base_url="http://localhost:8002") as client:
+    async with AgentClient(base_url="http://localhost:8002", external_connector=connector) as client:
         task_id = "test-task"
         # Start with completed state
-        await client._update_task_history(task_id, {
+        client._update_task_history(task_id, {
             "state": "completed",
             "message": {
                 "parts": [{"text": "Task completed"}]
@@ -205,7 +213,7 @@ async def test_history_error_handling(server_process):
         
         # Try to transition to working (should fail)
         with pytest.raises(Exception) as exc_info:
-            await client._update_task_history(task_id, {
+            client._update_task_history(task_id, {
                 "state": "working",
                 "message": {
                     "parts": [{"text": "Cannot work on completed task"}]
@@ -238,10 +246,10 @@ if __name__ == "__main__":
     try:
         # Run each test
         logger.info("Running task history tracking test...")
-        asyncio.run(test_task_history_tracking(None))
+        asyncio.run(test_task_history_tracking(None, None))
         
         logger.info("Running error handling test...")
-        asyncio.run(test_history_error_handling(None))
+        asyncio.run(test_history_error_handling(None, None))
         
         logger.info("All tests completed successfully!")
         
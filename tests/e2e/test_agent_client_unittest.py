@@ -2,7 +2,7 @@
 End-to-end tests for the A2A protocol client implementation using unittest
 """
 import asyncio
-import json
+import orjson
 import logging
 import os
 import threading
@@ -92,7 +92,7 @@ class TestAgentClient(unittest.TestCase):
             # Get agent card first
             logger.info("Requesting agent card...")
             agent_card = await client.get_agent_card()
-            logger.info(f"Agent card received: {json.dumps(agent_card, indent=2)}")
+            logger.info(f"Agent card received: {orjson.dumps(agent_card, option=orjson.OPT_INDENT_2).decode()}")
             
             # Create and send a task
             logger.info("Creating new task...")
@@ -100,7 +100,7 @@ class TestAgentClient(unittest.TestCase):
                 agent_card,
                 "Write a short comedy script about a misunderstanding at a coffee shop"
             )
-            logger.info(f"Task data created: {json.dumps(task_data, indent=2)}")
+            logger.info(f"Task data created: {orjson.dumps(task_data, option=orjson.OPT_INDENT_2).decode()}")
             
             task_response = await client.send_task(task_data)
             task_id = task_response["id"]
@@ -110,7 +110,7 @@ class TestAgentClient(unittest.TestCase):
                 # Wait for completion while tracking history
                 logger.info(f"Waiting for task {task_id} completion...")
                 result = await client.wait_for_completion(task_id)
-                logger.info(f"Task completed. Result: {json.dumps(result, indent=2)}")
+                logger.info(f"Task completed. Result: {orjson.dumps(result, option=orjson.OPT_INDENT_2).decode()}")
                 
                 # Get history for verification
                 history = client.task_history[task_id]
@@ -120,7 +120,7 @@ class TestAgentClient(unittest.TestCase):
                 for i, entry in enumerate(history, 1):
                     logger.info(f"State transition {i}: {entry['state']}")
                     if "message" in entry:
-                        logger.info(f"Message for state {entry['state']}: {json.dumps(entry['message'], indent=2)}")
+                        logger.info(f"Message for state {entry['state']}: {orjson.dumps(entry['message'], option=orjson.OPT_INDENT_2).decode()}")
                     logger.info(f"Timestamp: {entry['timestamp']}")
                     logger.info("-" * 50)
                 
@@ -192,8 +192,8 @@ class TestAgentClient(unittest.TestCase):
                     "parts": [{"text": "Task completed"}]
                 }
             }
-            await client._update_task_history(task_id, initial_state)
-            logger.info(f"Initial state set: {json.dumps(initial_state, indent=2)}")
+            client._update_task_history(task_id, initial_state)
+            logger.info(f"Initial state set: {orjson.dumps(initial_state, option=orjson.OPT_INDENT_2).decode()}")
             
             # Try to transition to working (should fail)
             logger.info("Attempting invalid transition to 'working' state...")
@@ -204,7 +204,7 @@ class TestAgentClient(unittest.TestCase):
                         "parts": [{"text": "Cannot work on completed task"}]
                     }
                 }
-                await client._update_task_history(task_id, invalid_state)
+                client._update_task_history(task_id, invalid_state)
             except Exception as e:
                 logger.info(f"Expected error for invalid state transition: {str(e)}")
         
@@ -5,177 +5,222 @@ including status updates and artifact updates.
 """
 import asyncio
 import pytest
-from datetime import datetime
-from typing import Dict, Any, List, Optional
-import json
+import pytest_asyncio
+from contextlib import AsyncExitStack, aclosing, asynccontextmanager
+from typing import Dict, Any, List, Optional, AsyncIterator
+import orjson
 import logging
-from dotenv import load_dotenv
-import subprocess
-import time
-import os
-import signal
 import aiohttp
 import uvicorn
-import threading
 import requests
-from fastapi import FastAPI
 from fastapi.testclient import TestClient
-import uuid
 
 from src.client import AgentClient
+from src.client.agent_client import JSON_HEADERS
 from src.api.app import app
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def is_server_running():
+def build_envelope(method: str, task_data: Dict[str, Any]) -> bytes:
+    """
+    * Build the serialized JSON-RPC envelope for a task request
+    * @param {str} method - JSON-RPC method (tasks/send or tasks/sendSubscribe)
+    * @param {Dict[str, Any]} task_data - Task metadata
+    * @returns {bytes} Request body ready to post
+    """
+    return orjson.dumps({
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": method,
+        "params": {
+            "sessionId": None,
+            "message": {
+                "role": "user",
+                "parts": [
+                    {
+                        "type": "text",
+                        "text": task_data["idea"]
+                    }
+                ]
+            },
+            "metadata": {
+                "title": task_data["title"],
+                "tags": task_data["tags"],
+                "idea": task_data["idea"],
+                "duration": task_data.get("duration"),
+                "lyrics": task_data.get("lyrics")
+            }
+        }
+    })
+
+# Task payloads shared by the tests, serialized once at import
+DREAM_TASK = {
+    "title": "AI Paints a Dream",
+    "tags": ["short story", "AI", "painting"],
+    "idea": "An AI learns to paint and discovers creativity.",
+    "duration": 5
+}
+ANALYSIS_TASK = {
+    "title": "War and Peace Analysis",
+    "tags": ["analysis", "literature", "War and Peace"],
+    "idea": "A detailed analysis of War and Peace.",
+    "duration": 60
+}
+INVALID_TASK = {
+    "title": "",
+    "tags": [],
+    "idea": "",
+    "duration": None
+}
+
+DREAM_SEND_BODY = build_envelope("tasks/send", DREAM_TASK)
+DREAM_SUBSCRIBE_BODY = build_envelope("tasks/sendSubscribe", DREAM_TASK)
+ANALYSIS_SEND_BODY = build_envelope("tasks/send", ANALYSIS_TASK)
+ANALYSIS_SUBSCRIBE_BODY = build_envelope("tasks/sendSubscribe", ANALYSIS_TASK)
+INVALID_SEND_BODY = build_envelope("tasks/send", INVALID_TASK)
+
+# Host part of requests sent over the test server's Unix socket
+UDS_BASE_URL = "http://localhost"
+
+def is_server_running(base_url: str = "http://localhost:8000"):
     """
     * Check if the server is already running
+    * @param {str} base_url - Base URL of the server to check
     * @returns {boolean} True if server is running, False otherwise
     """
     try:
-        response = requests.get("http://localhost:8000/health")
+        response = requests.get(f"{base_url}/health")
         return response.status_code == 200
     except requests.exceptions.ConnectionError:
         return False
 
-def run_server():
+class ReadyServer(uvicorn.Server):
     """
-    * Run the FastAPI server in a separate thread
+    * Uvicorn server that signals an event as soon as it accepts connections
+    * @param {uvicorn.Config} config - Server configuration
+    * @param {asyncio.Event} ready - Event set once startup has completed
+    """
+    def __init__(self, config: uvicorn.Config, ready: asyncio.Event):
+        super().__init__(config)
+        self.ready = ready
+
+    async def startup(self, sockets=None):
+        """
+        * Bind the sockets, then signal readiness
+        """
+        await super().startup(sockets=sockets)
+        self.ready.set()
+
+@asynccontextmanager
+async def serve_app(port: int = 8000, uds: Optional[str] = None, timeout: float = 10.0) -> AsyncIterator[str]:
+    """
+    * Serve the FastAPI app as a task on the running event loop
+    * The server shares the loop with the tests, so no thread is involved
+    * @param {int} port - Port to bind the server to
+    * @param {str} uds - Unix domain socket to bind instead of the TCP port
+    * @param {float} timeout - Maximum time to wait for startup in seconds
+    * @returns {str} Base URL of the running server
     """
     config = uvicorn.Config(
         app=app,
-        host="127.0.0.1",  # Changed from 0.0.0.0 to localhost
-        port=8000,
-        log_level="info",
+        host="127.0.0.1",
+        port=port,
+        uds=uds,
+        http="httptools",
+        log_level="warning",  # Keep per-request access logs off the hot path
         reload=False  # Ensure reload is disabled for testing
     )
-    server = uvicorn.Server(config)
-    server.run()
+    ready = asyncio.Event()
+    server = ReadyServer(config, ready)
+    serve_task = asyncio.create_task(server.serve())
+    try:
+        async with asyncio.timeout(timeout):
+            await ready.wait()
+        yield UDS_BASE_URL if uds else f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        await serve_task
 
-@pytest.fixture(scope="session")
-def server_process():
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def server_process(request, tmp_path_factory):
     """
-    * Fixture to manage the server process
-    * Starts the server if not running and ensures cleanup
+    * Fixture serving the app on the session event loop over a Unix domain
+    * socket, which skips the TCP loopback stack on every request
+    * Each pytest-xdist worker gets its own socket, so the tests can run in
+    * parallel with `pytest -n auto tests/e2e/`
+    * @returns {str} Path of the worker's server socket
     """
-    if not is_server_running():
-        logger.info("Starting server in a new thread...")
-        server_thread = threading.Thread(target=run_server, daemon=True)
-        server_thread.start()
-        
-        # Wait for server to start
-        retries = 5
-        while retries > 0 and not is_server_running():
-            time.sleep(1)
-            retries -= 1
-            logger.info(f"Waiting for server to start... {retries} retries left")
-        
-        if not is_server_running():
-            pytest.fail("Server failed to start")
-    
-    yield
-    # No need to cleanup as we're using daemon threads
+    worker_id = getattr(request.config, "workerinput", {}).get("workerid", "master")
+    socket_path = str(tmp_path_factory.mktemp("server") / "app.sock")
 
-@pytest.fixture
+    logger.info(f"Starting server for worker {worker_id} on {socket_path}...")
+    async with serve_app(uds=socket_path):
+        yield socket_path
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def agent_client(server_process):
+    """
+    * AgentClient entered once and shared by every async test in the session
+    * @returns {AgentClient} Client connected to the worker's server socket
+    """
+    connector = aiohttp.UnixConnector(path=server_process)
+    try:
+        async with AgentClient(base_url=UDS_BASE_URL, external_connector=connector) as client:
+            yield client
+    finally:
+        await connector.close()
+
+@pytest.fixture(scope="session")
 def test_client():
     """
-    * Create a test client for the FastAPI application
+    * Create a test client for the FastAPI application, shared across tests
     * @returns {TestClient} FastAPI test client
     """
     return TestClient(app)
 
-def test_stream_notifications(server_process, test_client):
+def test_stream_notifications(test_client):
     """
     * Test streaming notifications functionality using SSE endpoint
     """
     # Create a task first
-    task_data = {
-        "title": "AI Paints a Dream",
-        "tags": ["short story", "AI", "painting"],
-        "idea": "An AI learns to paint and discovers creativity.",
-        "duration": 5
-    }
-    envelope = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "tasks/send",
-        "params": {
-            "sessionId": None,
-            "message": {
-                "role": "user",
-                "parts": [
-                    {
-                        "type": "text",
-                        "text": task_data["idea"]
-                    }
-                ]
-            },
-            "metadata": {
-                "title": task_data["title"],
-                "tags": task_data["tags"],
-                "idea": task_data["idea"],
-                "duration": task_data.get("duration"),
-                "lyrics": task_data.get("lyrics")
-            }
-        }
-    }
-    response = test_client.post("/tasks/send", json=envelope)
+    response = test_client.post("/tasks/send", content=DREAM_SEND_BODY, headers=JSON_HEADERS)
     assert response.status_code == 200
-    task_id = response.json()["id"]
+    task_id = response.json()["result"]["id"]
     
-    # Now subscribe to updates
-    with test_client.get(f"/tasks/{task_id}", stream=True) as response:
-        assert response.status_code == 200
-        task_data = response.json()
-        assert "state" in task_data
-        assert task_data["state"] in {"submitted", "working", "completed", "failed"}
+    # Now check the task's current status
+    response = test_client.get(f"/tasks/{task_id}")
+    assert response.status_code == 200
+    task_data = response.json()
+    assert task_data["status"]["state"] in {"submitted", "working", "completed", "failed"}
 
-def test_cancel_notification(server_process, test_client):
+def test_cancel_notification(test_client):
     """
     * Test cancellation of notifications using HTTP endpoints
     """
     # Create a task first
-    task_data = {
-        "title": "War and Peace Analysis",
-        "tags": ["analysis", "literature", "War and Peace"],
-        "idea": "A detailed analysis of War and Peace.",
-        "duration": 60
-    }
-    envelope = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "tasks/send",
-        "params": {
-            "sessionId": None,
-            "message": {
-                "role": "user",
-                "parts": [
-                    {
-                        "type": "text",
-                        "text": task_data["idea"]
-                    }
-                ]
-            },
-            "metadata": {
-                "title": task_data["title"],
-                "tags": task_data["tags"],
-                "idea": task_data["idea"],
-                "duration": task_data.get("duration"),
-                "lyrics": task_data.get("lyrics")
-            }
-        }
-    }
-    response = test_client.post("/tasks/send", json=envelope)
+    response = test_client.post("/tasks/send", content=ANALYSIS_SEND_BODY, headers=JSON_HEADERS)
     assert response.status_code == 200
-    task_id = response.json()["id"]
+    task_id = response.json()["result"]["id"]
     
     # Cancel the task
     response = test_client.post(f"/tasks/{task_id}/cancel")
     assert response.status_code == 200
     task_data = response.json()
-    assert task_data["state"] == "cancelled"
+    assert task_data["status"]["state"] == "cancelled"
+
+# A2A task states and the transitions allowed from each one: nothing returns
+# to submitted, and a terminal state may only be repeated
+VALID_STATES = frozenset({"submitted", "working", "input-required", "completed", "failed", "cancelled"})
+TERMINAL_STATES = frozenset({"completed", "failed", "cancelled"})
+ALLOWED_NEXT: Dict[Optional[str], frozenset] = {
+    None: VALID_STATES,
+    "submitted": VALID_STATES,
+    "working": VALID_STATES - {"submitted"},
+    "input-required": VALID_STATES - {"submitted"},
+    **{state: frozenset({state}) for state in TERMINAL_STATES}
+}
 
 class NotificationCollector:
     """
@@ -189,7 +234,18 @@ class NotificationCollector:
         self.artifact_updates: List[Dict[str, Any]] = []
         self.max_notifications = max_notifications
         self.timeout = timeout
+        self.task_id: Optional[str] = None
         self.done = asyncio.Event()
+        self._state_events: Dict[str, asyncio.Event] = {}
+        
+    def _state_event(self, state: str) -> asyncio.Event:
+        """
+        Get the event signalled when a status update with the given state arrives
+        
+        @param state: Task state
+        @returns: Event for that state
+        """
+        return self._state_events.setdefault(state, asyncio.Event())
         
     def add_status_update(self, update: Dict[str, Any]):
         """
@@ -198,8 +254,23 @@ class NotificationCollector:
         @param update: Status update data
         """
         self.status_updates.append(update)
-        if update.get("state") in {"completed", "failed", "cancelled"}:
+        self._state_event(update.get("state")).set()
+        if update.get("state") in TERMINAL_STATES:
             self.done.set()
+            
+    async def wait(self):
+        """
+        Wait until the task has reached a terminal state
+        """
+        await self.done.wait()
+        
+    async def wait_for_state(self, state: str):
+        """
+        Wait until a status update with the given state has been received
+        
+        @param state: Task state to wait for
+        """
+        await self._state_event(state).wait()
         
     def add_artifact_update(self, update: Dict[str, Any]):
         """
@@ -223,285 +294,148 @@ class NotificationCollector:
         if not self.status_updates:
             return False
             
-        valid_states = {"submitted", "working", "input-required", "completed", "failed", "cancelled"}
         current_state = None
         
         for update in self.status_updates:
             state = update.get("state")
-            
-            # Verify state is valid
-            if state not in valid_states:
-                logger.error(f"Invalid state: {state}")
+            if state not in ALLOWED_NEXT.get(current_state, VALID_STATES):
+                logger.error(f"Invalid transition: Can't transition from {current_state} to {state}")
                 return False
-                
-            # Verify state transitions
-            if current_state:
-                # Can't go back to submitted
-                if current_state != "submitted" and state == "submitted":
-                    logger.error("Invalid transition: Can't return to submitted state")
-                    return False
-                    
-                # Can't continue after terminal state
-                if current_state in {"completed", "failed", "cancelled"} and state != current_state:
-                    logger.error(f"Invalid transition: Can't transition from {current_state} to {state}")
-                    return False
-                    
             current_state = state
             
         return True
 
-@pytest.mark.asyncio
-async def test_push_notifications_streaming(server_process=None):
+async def _consume_sse(events: AsyncIterator[Dict[str, Any]], collector: NotificationCollector):
+    """
+    Consume an SSE stream until the server closes it, feeding every update into the collector
+    
+    @param events: Decoded SSE events, as yielded by AgentClient.send_task_subscribe
+    @param collector: Collector receiving the status and artifact updates
+    """
+    async with aclosing(events) as stream:
+        async for data in stream:
+            logger.info(f"SSE update received: {data}")
+            
+            if "id" in data and collector.task_id is None:
+                collector.task_id = data["id"]
+                
+            if "status" in data:
+                collector.add_status_update(data["status"])
+                
+            if "artifacts" in data and data["artifacts"]:
+                for artifact in data["artifacts"]:
+                    collector.add_artifact_update(artifact)
+
+@pytest.mark.timeout(90)
+@pytest.mark.asyncio(loop_scope="session")
+async def test_push_notifications_streaming(agent_client):
     """
     * Test streaming push notifications during task execution using SSE
-    * @param server_process: Optional fixture parameter, not used when running directly
+    * @param agent_client: Session-scoped AgentClient connected to the server under test
     """
     collector = NotificationCollector(timeout=60.0)
     
-    async with AgentClient() as client:
-        # Get agent card
-        agent_card = await client.get_agent_card()
-        
-        # Create streaming task
-        task_data = {
-            "title": "AI Paints a Dream",
-            "tags": ["short story", "AI", "painting"],
-            "idea": "An AI learns to paint and discovers creativity.",
-            "duration": 5
-        }
-        envelope = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "tasks/sendSubscribe",
-            "params": {
-                "sessionId": None,
-                "message": {
-                    "role": "user",
-                    "parts": [
-                        {
-                            "type": "text",
-                            "text": task_data["idea"]
-                        }
-                    ]
-                },
-                "metadata": {
-                    "title": task_data["title"],
-                    "tags": task_data["tags"],
-                    "idea": task_data["idea"],
-                    "duration": task_data.get("duration"),
-                    "lyrics": task_data.get("lyrics")
-                }
-            }
-        }
-        
-        # Subscribe to SSE updates
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{client.base_url}/tasks/sendSubscribe",
-                json=envelope
-            ) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to subscribe to updates: {response.status}")
+    # Get agent card
+    agent_card = await agent_client.get_agent_card()
+    
+    # Subscribe to SSE updates over the client's pooled session and stop
+    # receiving as soon as the collector sees a terminal state
+    # Bound the stream so a stuck server surfaces as a TimeoutError
+    async with asyncio.timeout(collector.timeout):
+        recv_task = asyncio.create_task(
+            _consume_sse(agent_client.send_task_subscribe(DREAM_SUBSCRIBE_BODY), collector)
+        )
+        done_task = asyncio.create_task(collector.wait())
+        try:
+            done, _ = await asyncio.wait({recv_task, done_task}, return_when=asyncio.FIRST_COMPLETED)
+            if recv_task in done:
+                # Surface stream errors
+                recv_task.result()
+        finally:
+            recv_task.cancel()
+            done_task.cancel()
+            await asyncio.gather(recv_task, done_task, return_exceptions=True)
                 
-                try:
-                    async for event in response.content:
-                        if event:
-                            event_data = event.decode()
-                            # Skip heartbeats and empty lines
-                            if not event_data.strip() or event_data == "data: ":
-                                continue
-                                
-                            # Ensure it's a data event and extract the JSON
-                            if event_data.startswith("data: "):
-                                try:
-                                    data = json.loads(event_data.replace("data: ", "", 1))
-                                    logger.info(f"SSE update received: {data}")
-                                    
-                                    if "status" in data:
-                                        collector.add_status_update(data["status"])
-                                        
-                                    if "artifacts" in data and data["artifacts"]:
-                                        for artifact in data["artifacts"]:
-                                            collector.add_artifact_update(artifact)
-                                            
-                                    # Check if we're done
-                                    if collector.done.is_set():
-                                        break
-                                        
-                                except json.JSONDecodeError as e:
-                                    logger.error(f"Error decoding JSON from SSE event: {e}")
-                                    logger.debug(f"Raw event data: {event_data}")
-                                    continue
-                except asyncio.TimeoutError:
-                    logger.warning("SSE connection timed out")
-                    
-        # Verify notifications
-        assert collector.total_notifications > 0, "No notifications received"
-        assert collector.verify_status_sequence(), "Invalid status transition sequence"
-        
-        # Verify final state
-        final_status = collector.status_updates[-1]
-        assert final_status["state"] in {"completed", "failed", "cancelled"}, \
-            f"Task did not reach terminal state. Final state: {final_status['state']}"
+    # Verify notifications
+    assert collector.total_notifications > 0, "No notifications received"
+    assert collector.verify_status_sequence(), "Invalid status transition sequence"
+    
+    # Verify final state
+    final_status = collector.status_updates[-1]
+    assert final_status["state"] in TERMINAL_STATES, \
+        f"Task did not reach terminal state. Final state: {final_status['state']}"
 
-@pytest.mark.asyncio
-async def test_push_notifications_error_handling():
+@pytest.mark.timeout(90)
+@pytest.mark.asyncio(loop_scope="session")
+async def test_push_notifications_error_handling(agent_client):
     """
     Test error handling in push notifications
+    
+    @param agent_client: Session-scoped AgentClient connected to the server under test
     """
     collector = NotificationCollector()
     
-    async with AgentClient() as client:
-        # Get agent card
-        agent_card = await client.get_agent_card()
-        
-        # Create task with invalid data to trigger error
-        task_data = {
-            "title": "",
-            "tags": [],
-            "idea": "",
-            "duration": None
-        }
-        envelope = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "tasks/send",
-            "params": {
-                "sessionId": None,
-                "message": {
-                    "role": "user",
-                    "parts": [
-                        {
-                            "type": "text",
-                            "text": task_data["idea"]
-                        }
-                    ]
-                },
-                "metadata": {
-                    "title": task_data["title"],
-                    "tags": task_data["tags"],
-                    "idea": task_data["idea"],
-                    "duration": task_data.get("duration"),
-                    "lyrics": task_data.get("lyrics")
-                }
-            }
-        }
+    # Get agent card
+    agent_card = await agent_client.get_agent_card()
+    
+    # Expect task to fail
+    with pytest.raises(Exception) as exc_info:
+        task_response = await agent_client.send_task(INVALID_SEND_BODY)
         
-        # Expect task to fail
-        with pytest.raises(Exception) as exc_info:
-            task_response = await client.send_task(envelope)
-            
-        assert "Failed to send task" in str(exc_info.value)
+    assert "Failed to send task" in str(exc_info.value)
 
-@pytest.mark.asyncio
-async def test_push_notifications_cancellation():
+@pytest.mark.timeout(90)
+@pytest.mark.asyncio(loop_scope="session")
+async def test_push_notifications_cancellation(agent_client):
     """
     Test cancellation handling in push notifications
+    
+    @param agent_client: Session-scoped AgentClient connected to the server under test
     """
     collector = NotificationCollector()
     task_id = None
     
-    async with AgentClient() as client:
-        # Get agent card
-        agent_card = await client.get_agent_card()
+    # Get agent card
+    agent_card = await agent_client.get_agent_card()
+    
+    # Subscribe to SSE updates with a single reader consuming the whole stream,
+    # so the cancelled frame can't slip through between two read loops. The
+    # cancel and status calls share the client's connection pool with it.
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(_consume_sse(agent_client.send_task_subscribe(ANALYSIS_SUBSCRIBE_BODY), collector))
         
-        # Create long-running task
-        task_data = {
-            "title": "War and Peace Analysis",
-            "tags": ["analysis", "literature", "War and Peace"],
-            "idea": "A detailed analysis of War and Peace.",
-            "duration": 60
-        }
-        envelope = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "tasks/sendSubscribe",
-            "params": {
-                "sessionId": None,
-                "message": {
-                    "role": "user",
-                    "parts": [
-                        {
-                            "type": "text",
-                            "text": task_data["idea"]
-                        }
-                    ]
-                },
-                "metadata": {
-                    "title": task_data["title"],
-                    "tags": task_data["tags"],
-                    "idea": task_data["idea"],
-                    "duration": task_data.get("duration"),
-                    "lyrics": task_data.get("lyrics")
-                }
-            }
-        }
+        async with asyncio.timeout(collector.timeout):
+            await collector.wait_for_state("working")
+        task_id = collector.task_id
+        if not task_id:
+            raise Exception("Failed to get task ID from initial response")
         
-        # Subscribe to SSE updates
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{client.base_url}/tasks/sendSubscribe",
-                json=envelope
-            ) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to subscribe to updates: {response.status}")
-                
-                # Process events until we get the task ID and working state
-                async for event in response.content:
-                    if event:
-                        event_data = event.decode()
-                        # Skip heartbeats and empty lines
-                        if not event_data.strip() or event_data == "data: ":
-                            continue
-                            
-                        # Ensure it's a data event and extract the JSON
-                        if event_data.startswith("data: "):
-                            try:
-                                data = json.loads(event_data.replace("data: ", "", 1))
-                                if "id" in data:
-                                    task_id = data["id"]
-                                if "status" in data:
-                                    collector.add_status_update(data["status"])
-                                    if data["status"]["state"] == "working":
-                                        break
-                            except json.JSONDecodeError as e:
-                                logger.error(f"Error decoding JSON from SSE event: {e}")
-                                logger.debug(f"Raw event data: {event_data}")
-                                continue
-                
-                if not task_id:
-                    raise Exception("Failed to get task ID from initial response")
-                
-                # Let task run briefly
-                await asyncio.sleep(2)
-                
-                # Cancel the task
-                try:
-                    cancel_response = await client.cancel_task(task_id)
-                    collector.add_status_update(cancel_response["status"])
-                    logger.info(f"Task cancelled successfully: {cancel_response['status']}")
-                except Exception as e:
-                    logger.error(f"Failed to cancel task: {str(e)}")
-                    raise
-
-                # No need to wait for more SSE updates after cancellation
-                # The connection will be closed by the server
-                logger.info("Task cancelled, SSE connection will be closed")
-
-        # Verify status sequence
-        assert collector.verify_status_sequence(), "Invalid status transition sequence"
+        # Cancel the task
+        try:
+            cancel_response = await agent_client.cancel_task(task_id)
+            logger.info(f"Task cancelled successfully: {cancel_response['status']}")
+        except Exception as e:
+            logger.error(f"Failed to cancel task: {str(e)}")
+            raise
         
-        # Get final status directly
-        final_status = await client.check_task_status(task_id)
-        collector.add_status_update(final_status["status"])
+        # Wait for the cancelled update pushed over SSE
+        async with asyncio.timeout(10):
+            await collector.done.wait()
+
+    # Verify status sequence
+    assert collector.verify_status_sequence(), "Invalid status transition sequence"
+    
+    # Get final status directly
+    final_status = await agent_client.check_task_status(task_id)
+    collector.add_status_update(final_status["status"])
+    
+    assert final_status["status"]["state"] == "cancelled", \
+        f"Task was not properly cancelled. Final state: {final_status['status']['state']}"
         
-        assert final_status["status"]["state"] == "cancelled", \
-            f"Task was not properly cancelled. Final state: {final_status['status']['state']}"
-            
-        # Verify we can't cancel an already cancelled task
-        with pytest.raises(Exception) as exc_info:
-            await client.cancel_task(task_id)
-        assert "Cannot cancel task in cancelled state" in str(exc_info.value)
+    # Verify we can't cancel an already cancelled task
+    with pytest.raises(Exception) as exc_info:
+        await agent_client.cancel_task(task_id)
+    assert "Cannot cancel task in cancelled state" in str(exc_info.value)
 
 if __name__ == "__main__":
     # Run async tests directly
@@ -511,38 +445,32 @@ if __name__ == "__main__":
         * This allows for proper debugging with breakpoints
         """
         # Start server if needed
-        server_thread = None
-        if not is_server_running():
-            logger.info("Server not running. Starting server...")
-            server_thread = threading.Thread(target=run_server, daemon=True)
-            server_thread.start()
-            
-            # Wait for server to start
-            retries = 5
-            while retries > 0 and not is_server_running():
-                time.sleep(1)
-                retries -= 1
-                logger.info(f"Waiting for server to start... {retries} retries left")
+        base_url = "http://localhost:8000"
+        async with AsyncExitStack() as stack:
+            if not is_server_running(base_url):
+                logger.info("Server not running. Starting server...")
+                base_url = await stack.enter_async_context(serve_app())
             
-            if not is_server_running():
-                raise Exception("Server failed to start")
-
-        try:
-            # Run each test
-            logger.info("Running streaming notifications test...")
-            await test_push_notifications_streaming()
+            try:
+                # The tests use separate tasks, so run them concurrently over the
+                # client's shared connection pool
+                logger.info("Running streaming, error handling and cancellation tests...")
+                async with AgentClient(base_url=base_url) as client:
+                    results = await asyncio.gather(
+                        test_push_notifications_streaming(client),
+                        test_push_notifications_error_handling(client),
+                        test_push_notifications_cancellation(client),
+                        return_exceptions=True
+                    )
+                for result in results:
+                    if isinstance(result, BaseException):
+                        raise result
             
-            logger.info("Running error handling test...")
-            await test_push_notifications_error_handling()
+                logger.info("All tests completed successfully!")
             
-            logger.info("Running cancellation test...")
-            await test_push_notifications_cancellation()
-            
-            logger.info("All tests completed successfully!")
-            
-        except Exception as e:
-            logger.error(f"Test failed: {str(e)}")
-            raise
+            except Exception as e:
+                logger.error(f"Test failed: {str(e)}")
+                raise
 
     # Run the tests
     asyncio.run(run_tests())
\ No newline at end of file
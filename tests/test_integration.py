@@ -2,47 +2,185 @@
 Integration tests for the API using a real server instance.
 """
 import pytest
-from fastapi.testclient import TestClient
+import pytest_asyncio
 import asyncio
+import httpx
+import orjson
 import time
-from datetime import datetime
+from contextlib import aclosing
 from src.api.app import app
 from src.models.task import TaskState
 
-@pytest.fixture
-def test_client():
+TERMINAL_STATES = {TaskState.COMPLETED.value, TaskState.FAILED.value, TaskState.CANCELLED.value}
+
+# Stateless, so one transport serves every client in the module
+ASGI_TRANSPORT = httpx.ASGITransport(app=app)
+
+# Request bodies are serialized once at import and posted as raw bytes
+JSON_HEADERS = {"content-type": "application/json"}
+
+def build_send_body(request_id, session_id, metadata):
+    """
+    Build a serialized tasks/send JSON-RPC request carrying the script parameters.
+    
+    @param {str} request_id - JSON-RPC request id
+    @param {str} session_id - Session the task belongs to
+    @param {dict} metadata - Script parameters (title, tags, idea, lyrics, duration)
+    @returns {bytes} Request body ready to post
+    """
+    return orjson.dumps({
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "tasks/send",
+        "params": {
+            "sessionId": session_id,
+            "message": {
+                "role": "user",
+                "parts": [{"type": "text", "text": metadata["idea"]}]
+            },
+            "metadata": metadata
+        }
+    })
+
+SCRIPT_GENERATION_BODY = build_send_body("generation", "test-integration", {
+    "title": "Test Integration",
+    "tags": ["test", "integration"],
+    "idea": "A simple test of the movie script generator",
+    "lyrics": None,
+    "duration": 60
+})
+CANCELLATION_BODY = build_send_body("cancellation", "test-cancel", {
+    "title": "Test Cancellation",
+    "tags": ["test", "cancel"],
+    "idea": "A task that will be cancelled",
+    "lyrics": None,
+    "duration": 120
+})
+LISTING_SESSION_ID = "test-listing"
+LISTING_BODIES = [
+    build_send_body(f"listing-{i}", LISTING_SESSION_ID, {
+        "title": f"Test List {i}",
+        "tags": ["test", "list"],
+        "idea": f"Task number {i} for listing test",
+        "lyrics": None,
+        "duration": 60
+    })
+    for i in range(3)
+]
+
+async def wait_for_state(client, task_id, state, timeout=5.0):
     """
-    Create a test client for the FastAPI application.
+    Poll a task with exponential backoff until it reaches the given state.
     
-    @returns {TestClient} A FastAPI test client instance
+    @param {httpx.AsyncClient} client - In-process ASGI client
+    @param {str} task_id - ID of the task to poll
+    @param {str} state - State to wait for
+    @param {float} timeout - Maximum time to wait in seconds
+    @raises {TimeoutError} If the state is not reached in time
     """
-    return TestClient(app)
+    delay = 0.05
+    deadline = time.monotonic() + timeout
+    while True:
+        response = await client.get(f"/tasks/{task_id}")
+        assert response.status_code == 200
+        if orjson.loads(response.content)["status"]["state"] == state:
+            return
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Task {task_id} did not reach {state} within {timeout}s")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 1.0)
+
+async def iter_sse_data(response):
+    """
+    Yield the data payload of each SSE frame, scanning raw bytes for frame
+    boundaries instead of splitting the stream into text lines.
+    
+    @param {httpx.Response} response - Open streaming response
+    @returns {AsyncIterator[bytes]} Data payload of each frame
+    """
+    buffer = bytearray()
+    async for chunk in response.aiter_bytes():
+        buffer += chunk
+        start = 0
+        while (end := buffer.find(b"\n\n", start)) != -1:
+            frame_start, start = start, end + 2
+            if buffer.startswith(b"data: ", frame_start, end):
+                data_start = frame_start + len(b"data: ")
+            else:
+                data_line = buffer.find(b"\ndata: ", frame_start, end)
+                if data_line == -1:
+                    continue
+                data_start = data_line + len(b"\ndata: ")
+            yield bytes(buffer[data_start:end])
+        del buffer[:start]
+
+async def await_terminal(client, task_id, timeout=30.0):
+    """
+    Wait until a task reaches a terminal state, following its SSE stream.
+    Falls back to polling if the server has no subscribe endpoint.
+    
+    @param {httpx.AsyncClient} client - In-process ASGI client
+    @param {str} task_id - ID of the task to follow
+    @param {float} timeout - Maximum polling time in seconds when falling back
+    @returns {str} The terminal state reached
+    @raises {TimeoutError} If polling does not see a terminal state in time
+    """
+    async with client.stream("GET", f"/tasks/{task_id}/subscribe") as response:
+        if response.status_code != 404:
+            assert response.status_code == 200
+            # Close the frame reader and the response as soon as a terminal event arrives
+            async with aclosing(iter_sse_data(response)) as frames:
+                async for data in frames:
+                    event = orjson.loads(data)
+                    if "error" in event:
+                        state = TaskState.FAILED.value
+                    elif "status" in event and event["status"]["state"] in TERMINAL_STATES:
+                        state = event["status"]["state"]
+                    else:
+                        continue
+                    await response.aclose()
+                    return state
+            raise AssertionError(f"Task {task_id} stream ended before a terminal state")
+    
+    delay = 0.05
+    deadline = time.monotonic() + timeout
+    while True:
+        response = await client.get(f"/tasks/{task_id}")
+        assert response.status_code == 200
+        state = orjson.loads(response.content)["status"]["state"]
+        if state in TERMINAL_STATES:
+            return state
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Task {task_id} did not finish within {timeout}s")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 1.0)
+
+@pytest_asyncio.fixture
+async def client():
+    """
+    Create an async client dispatching requests to the app in-process.
+    
+    @returns {httpx.AsyncClient} Client bound to the app over ASGI
+    """
+    async with httpx.AsyncClient(transport=ASGI_TRANSPORT, base_url="http://test") as client:
+        yield client
 
 @pytest.mark.asyncio
-async def test_real_script_generation(test_client):
+@pytest.mark.timeout(120)
+async def test_real_script_generation(client):
     """
     Test real script generation without mocks.
     Verifies that the endpoint returns immediately with SUBMITTED state
     and eventually transitions to COMPLETED.
     
-    @param {TestClient} test_client - FastAPI test client
+    @param {httpx.AsyncClient} client - In-process ASGI client
     """
-    # Test data
-    request_data = {
-        "title": "Test Integration",
-        "tags": ["test", "integration"],
-        "idea": "A simple test of the movie script generator",
-        "lyrics": None,
-        "duration": 60,
-        "sessionId": "test-integration"
-    }
-
     # Make initial request
-    response = test_client.post("/tasks/send", json=request_data)
+    response = await client.post("/tasks/send", content=SCRIPT_GENERATION_BODY, headers=JSON_HEADERS)
     assert response.status_code == 200
     
     # Verify initial response
-    result = response.json()
+    result = orjson.loads(response.content)["result"]
     assert result["id"] is not None
     assert result["status"]["state"] == TaskState.SUBMITTED.value
     assert "Starting script generation..." in result["status"]["message"]["parts"][0]["text"]
@@ -50,35 +188,15 @@ async def test_real_script_generation(test_client):
     # Store task ID
     task_id = result["id"]
     
-    # Poll task status until completion or timeout
-    max_retries = 30  # 30 seconds timeout
-    current_try = 0
-    final_state = None
-    
-    while current_try < max_retries:
-        # Get task status
-        response = test_client.get(f"/tasks/{task_id}")
-        assert response.status_code == 200
-        
-        task_status = response.json()
-        current_state = task_status["status"]["state"]
-        
-        # Break if terminal state reached
-        if current_state in [TaskState.COMPLETED.value, TaskState.FAILED.value]:
-            final_state = current_state
-            break
-            
-        # Wait before next poll
-        current_try += 1
-        await asyncio.sleep(1)  # Reduced sleep time for tests
+    # Block until the task finishes
+    final_state = await await_terminal(client, task_id)
     
     # Verify final state
-    assert final_state is not None, "Task did not reach terminal state within timeout"
     assert final_state == TaskState.COMPLETED.value, "Task failed or did not complete"
     
     # Verify task artifacts
-    response = test_client.get(f"/tasks/{task_id}")
-    task_result = response.json()
+    response = await client.get(f"/tasks/{task_id}")
+    task_result = orjson.loads(response.content)
     
     assert "artifacts" in task_result
     assert len(task_result["artifacts"]) > 0
@@ -97,67 +215,50 @@ async def test_real_script_generation(test_client):
     assert isinstance(outline_artifact["scenes"], list)
     assert isinstance(outline_artifact["metadata"], dict)
 
-def test_real_task_cancellation(test_client):
+@pytest.mark.asyncio
+async def test_real_task_cancellation(client):
     """
     Test real task cancellation without mocks.
     
-    @param {TestClient} test_client - FastAPI test client
+    @param {httpx.AsyncClient} client - In-process ASGI client
     """
-    # Create a task
-    request_data = {
-        "title": "Test Cancellation",
-        "tags": ["test", "cancel"],
-        "idea": "A task that will be cancelled",
-        "lyrics": None,
-        "duration": 120,
-        "sessionId": "test-cancel"
-    }
-    
     # Start task
-    response = test_client.post("/tasks/send", json=request_data)
+    response = await client.post("/tasks/send", content=CANCELLATION_BODY, headers=JSON_HEADERS)
     assert response.status_code == 200
-    task_id = response.json()["id"]
+    task_id = orjson.loads(response.content)["result"]["id"]
     
-    # Wait briefly to ensure task processing has started
-    time.sleep(0.5)
+    # Wait until task processing has started
+    await wait_for_state(client, task_id, TaskState.WORKING.value)
     
     # Cancel task
-    response = test_client.post(f"/tasks/{task_id}/cancel")
+    response = await client.post(f"/tasks/{task_id}/cancel")
     assert response.status_code == 200
     
     # Verify cancellation
-    result = response.json()
+    result = orjson.loads(response.content)
     assert result["status"]["state"] == TaskState.CANCELLED.value
     assert "Task cancelled" in result["status"]["message"]["parts"][0]["text"]
 
-def test_real_task_listing(test_client):
+@pytest.mark.asyncio
+async def test_real_task_listing(client):
     """
     Test real task listing functionality without mocks.
+    The tasks are created concurrently.
     
-    @param {TestClient} test_client - FastAPI test client
+    @param {httpx.AsyncClient} client - In-process ASGI client
     """
     # Create multiple tasks
-    session_id = "test-listing"
-    tasks = []
-    
-    for i in range(3):
-        request_data = {
-            "title": f"Test List {i}",
-            "tags": ["test", "list"],
-            "idea": f"Task number {i} for listing test",
-            "lyrics": None,
-            "duration": 60,
-            "sessionId": session_id
-        }
-        
-        response = test_client.post("/tasks/send", json=request_data)
-        assert response.status_code == 200
-        tasks.append(response.json()["id"])
+    session_id = LISTING_SESSION_ID
+    responses = await asyncio.gather(
+        *(client.post("/tasks/send", content=body, headers=JSON_HEADERS) for body in LISTING_BODIES)
+    )
+    assert all(response.status_code == 200 for response in responses)
+    tasks = [orjson.loads(response.content)["result"]["id"] for response in responses]
     
     # List all tasks
-    response = test_client.get("/tasks")
+    response = await client.get("/tasks")
     assert response.status_code == 200
-    all_tasks = response.json()
+    all_tasks = orjson.loads(response.content)
     
     # Verify all created tasks are present
     task_ids = [task["id"] for task in all_tasks]
@@ -165,9 +266,9 @@ def test_real_task_listing(test_client):
         assert task_id in task_ids
     
     # Filter by session
-    response = test_client.get(f"/tasks?session_id={session_id}")
+    response = await client.get(f"/tasks?session_id={session_id}")
     assert response.status_code == 200
-    session_tasks = response.json()
+    session_tasks = orjson.loads(response.content)
     
     # Verify all tasks in session are present
     assert len(session_tasks) == len(tasks)
@@ -2,27 +2,30 @@
 Tests for the API routes.
 """
 import pytest
-from unittest.mock import MagicMock, AsyncMock, patch, Mock
-from fastapi import status, APIRouter
-from src.api.models import ScriptRequest
-from src.models.task import TaskState, TaskStatus, Message, TextPart, Task
-from src.core.task_processor import TaskProcessor
-from src.server import app, get_task_processor
-from src.controllers.a2a_controller import A2AController, TaskRequest
-from src.models.a2a import TaskSendParams, PushNotificationConfig
-from datetime import datetime
-import json
+import pytest_asyncio
+from unittest.mock import MagicMock, patch
+from src.models.task import TaskState, TaskStatus, Message, TextPart
+from src.api.app import app
+from src.controllers.a2a_controller import controller as a2a_controller
+from src.models.a2a import Task, PushNotificationConfig
+import orjson
 import httpx
 import asyncio
-import sys
-from fastapi.testclient import TestClient
+from contextlib import ExitStack
 import uuid
-import logging
-from typing import List, Optional, AsyncGenerator
+import itertools
+from typing import Dict, List, Tuple
+from pydantic import BaseModel, TypeAdapter
 
-# Configurar logging
-logging.basicConfig(level=logging.DEBUG)
-logger = logging.getLogger(__name__)
+# Fixed status timestamp for test tasks; no test checks the time itself
+FIXED_TIMESTAMP = "2024-01-01T00:00:00"
+
+# Sequential ids for test tasks, cheaper than uuid4 and reproducible across runs
+_fake_uuids = itertools.count(1)
+
+def fake_uuid() -> str:
+    """Return the next sequential UUID string"""
+    return str(uuid.UUID(int=next(_fake_uuids)))
 
 # Mock test data
 MOCK_SCRIPT_RESULT = {
@@ -52,67 +55,102 @@ MOCK_SCRIPT_RESULT = {
     "characters": []
 }
 
-MOCK_TASK_REQUEST = {
-    "id": "test-123",
-    "sessionId": "session-123",
-    "message": {
-        "role": "user",
-        "parts": [
-            {
-                "type": "text",
-                "text": "Generate a movie script",
-                "metadata": {
-                    "genre": "comedy",
-                    "tone": "light",
-                    "length": "short"
-                }
-            }
-        ]
-    },
-    "metadata": {
-        "title": "Test Script",
-        "genre": "comedy",
-        "tone": "light",
-        "length": "short",
-        "tags": ["test"]
-    }
+MOCK_PUSH_CONFIG = {
+    "events": ["task.completed", "task.failed"],
+    "url": "http://test.com/webhook"
 }
 
-MOCK_TASK = {
-    "id": "test-task-id",
-    "sessionId": None,
-    "status": {
-        "state": TaskState.COMPLETED,
-        "timestamp": datetime.utcnow().isoformat(),
+# Request bodies are serialized once at import and posted as raw bytes
+JSON_HEADERS = {"content-type": "application/json"}
+MOCK_PUSH_CONFIG_BODY = orjson.dumps(MOCK_PUSH_CONFIG)
+# Push config without a url and with events that are not a list
+MOCK_INVALID_PUSH_CONFIG_BODY = orjson.dumps({"events": "task.completed"})
+# JSON-RPC request whose message has no parts, rejected by /tasks/send
+MOCK_INVALID_SEND_BODY = orjson.dumps({
+    "jsonrpc": "2.0",
+    "id": "test-123",
+    "method": "tasks/send",
+    "params": {
+        "message": {"role": "user"},
+        "sessionId": "test-session"
+    }
+})
+MOCK_SEND_BODY = orjson.dumps({
+    "jsonrpc": "2.0",
+    "id": "test-123",
+    "method": "tasks/send",
+    "params": {
         "message": {
-            "role": "assistant",
+            "role": "user",
             "parts": [
                 {
                     "type": "text",
-                    "text": "Script generated successfully",
-                    "metadata": {}
+                    "text": "Generate a movie script",
+                    "metadata": {
+                        "genre": "comedy",
+                        "tone": "light",
+                        "length": "short"
+                    }
                 }
-            ],
-            "metadata": {}
+            ]
+        },
+        "sessionId": "test-session",
+        "metadata": {
+            "title": "Test Script",
+            "tags": ["test"],
+            "idea": "A test script about testing",
+            "duration": 120
         }
-    },
-    "metadata": {
-        "title": "Test Script",
-        "tags": ["test", "movie"],
-        "idea": "A test movie script",
-        "duration": 120
     }
-}
+})
+
+def build_task_templates() -> Dict[TaskState, Task]:
+    """Build one validated test task per state, to be copied by tests"""
+    return {
+        state: Task(
+            id="template",
+            sessionId="template",
+            status=TaskStatus(
+                state=state,
+                timestamp=FIXED_TIMESTAMP,
+                message=Message(
+                    role="assistant",
+                    parts=[TextPart(type="text", text="Test task")]
+                )
+            ),
+            metadata={
+                "title": "Test Script",
+                "tags": ["test"],
+                "idea": "Test idea",
+                "lyrics": None,
+                "duration": 120
+            }
+        )
+        for state in (TaskState.WORKING, TaskState.COMPLETED, TaskState.FAILED, TaskState.CANCELLED)
+    }
 
-MOCK_INVALID_REQUEST = {
-    "id": "test-task-id",
-    "invalid_field": "invalid"
-}
+class ExpectedStatus(BaseModel):
+    """Task status fields checked by the route tests; other fields are ignored"""
+    state: TaskState
 
-MOCK_PUSH_CONFIG = {
-    "events": ["task.completed", "task.failed"],
-    "url": "http://test.com/webhook"
-}
+class ExpectedTask(BaseModel):
+    """Task fields checked by the route tests; other fields are ignored"""
+    id: str
+    status: ExpectedStatus
+
+class ExpectedPushConfig(BaseModel):
+    """Push notification config fields checked by the route tests; other fields are ignored"""
+    url: str
+    events: List[str]
+
+# Adapters are built once and validate a payload straight from its JSON bytes
+EXPECTED_TASK_ADAPTER = TypeAdapter(ExpectedTask)
+EXPECTED_TASK_LIST_ADAPTER = TypeAdapter(List[ExpectedTask])
+EXPECTED_PUSH_CONFIG_ADAPTER = TypeAdapter(ExpectedPushConfig)
+
+def assert_payload(content: bytes, adapter: TypeAdapter, expected):
+    """Parse and validate a payload in one pass, then compare it with the expected value"""
+    assert adapter.validate_json(content) == expected
 
 class MockScriptService:
     """Mock class for ScriptService"""
@@ -139,304 +177,181 @@ class MockLogger:
     def warning(self, *args, **kwargs):
         pass
 
-class MockTaskProcessor(TaskProcessor):
-    """Mock implementation of TaskProcessor for testing"""
-    
-    def __init__(self):
-        """Initialize mock task processor"""
-        self._tasks = {}
-        self._push_configs = {}
-        self._task_updates = {}
-        self._logger = logging.getLogger("mock_task_processor")
-
-    async def process_task(self, task_params: TaskSendParams) -> Task:
-        """Mock task processing"""
-        task = Task(
-            id=task_params.id or str(uuid.uuid4()),
-            sessionId=task_params.sessionId or str(uuid.uuid4()),
-            status=TaskStatus(
-                state=TaskState.SUBMITTED,
-                timestamp=datetime.utcnow().isoformat(),
-                message=Message(
-                    role="assistant",
-                    parts=[TextPart(type="text", text="Task submitted")]
-                )
-            ),
-            metadata=task_params.metadata
-        )
-        self._tasks[task.id] = task
-        self._task_updates[task.id] = asyncio.Queue()
-        await self._task_updates[task.id].put(task)
-        return task
-
-    async def get_task(self, task_id: str) -> Task:
-        """Mock get task"""
-        if task_id not in self._tasks:
-            raise ValueError(f"Task {task_id} not found")
-        return self._tasks[task_id]
-
-    async def cancel_task(self, task_id: str) -> Task:
-        """Mock task cancellation"""
-        if task_id not in self._tasks:
-            raise ValueError(f"Task {task_id} not found")
-        task = self._tasks[task_id]
-        task.status.state = TaskState.CANCELLED
-        task.status.timestamp = datetime.utcnow().isoformat()
-        task.status.message = Message(
-            role="assistant",
-            parts=[TextPart(type="text", text="Task cancelled")]
-        )
-        return task
-
-    async def list_tasks(self) -> List[Task]:
-        """Mock list tasks"""
-        return list(self._tasks.values())
-
-    async def set_push_notification(self, task_id: str, config: PushNotificationConfig) -> PushNotificationConfig:
-        """Mock set push notification"""
-        if task_id not in self._tasks:
-            raise ValueError(f"Task {task_id} not found")
-        self._push_configs[task_id] = config
-        return config
-
-    async def get_push_notification(self, task_id: str) -> Optional[PushNotificationConfig]:
-        """Mock get push notification"""
-        if task_id not in self._tasks:
-            raise ValueError(f"Task {task_id} not found")
-        return self._push_configs.get(task_id)
-
-    async def get_task_updates(self, task_id: str) -> AsyncGenerator[Task, None]:
-        """Mock task updates generator"""
-        if task_id not in self._tasks:
-            raise ValueError(f"Task {task_id} not found")
-        
-        queue = self._task_updates[task_id]
-        while True:
-            try:
-                task = await queue.get()
-                yield task
-                if task.status.state in [TaskState.COMPLETED, TaskState.FAILED, TaskState.CANCELLED]:
-                    break
-            except asyncio.CancelledError:
-                break
-
-    def _create_test_task(self, task_id: str, state: TaskState = TaskState.WORKING) -> Task:
-        """Helper method to create a test task"""
-        task = Task(
-            id=task_id,
-            sessionId=str(uuid.uuid4()),
-            status=TaskStatus(
-                state=state,
-                timestamp=datetime.utcnow().isoformat(),
-                message=Message(
-                    role="assistant",
-                    parts=[TextPart(type="text", text="Test task")]
-                )
-            ),
-            metadata={
-                "title": "Test Script",
-                "tags": ["test"],
-                "idea": "Test idea",
-                "lyrics": None,
-                "duration": 120
-            }
-        )
-        self._tasks[task_id] = task
-        return task
+# Patchers for the external dependencies, built once and entered for the module
+DEPENDENCY_PATCHES = [
+    patch('src.core.script_service.ScriptService', MockScriptService),
+    patch('src.utils.logger.logger', MockLogger()),
+    patch('src.core.generator.logger', MockLogger()),
+    patch('src.api.routes.logger', MockLogger()),
+    patch('src.controllers.a2a_controller.logger', MockLogger()),
+    patch('openai.AsyncOpenAI', MagicMock()),
+    # Tasks sent through the routes are processed in the background with the controller's generator
+    patch.object(a2a_controller, 'generator', MagicMock(**{'generate_script.return_value': MOCK_SCRIPT_RESULT}))
+]
+
+@pytest.fixture(scope="module", autouse=True)
+def mock_all_dependencies():
+    """Mock all external dependencies once for the whole module"""
+    with ExitStack() as stack:
+        for p in DEPENDENCY_PATCHES:
+            stack.enter_context(p)
+        yield
+
+@pytest.fixture(scope="session")
+def task_templates():
+    """Fixture for the prebuilt task templates, shared by the whole session"""
+    return build_task_templates()
+
+@pytest.fixture(scope="module")
+def controller(mock_all_dependencies):
+    """The controller singleton the app's routes delegate to"""
+    return a2a_controller
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def client(controller):
+    """Fixture for an in-process ASGI client shared by the module"""
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
 
 @pytest.fixture(autouse=True)
-def mock_all_dependencies():
-    """Mock all external dependencies"""
-    patches = [
-        patch('src.core.script_service.ScriptService', MockScriptService),
-        patch('src.utils.logger.logger', MockLogger()),
-        patch('src.core.generator.logger', MockLogger()),
-        patch('openai.AsyncOpenAI', MagicMock()),
-        patch.dict(sys.modules, {
-            'openai': MagicMock(),
-            'crewai': MagicMock(),
-            'crewai.Agent': MagicMock(),
-            'crewai.Crew': MagicMock(),
-            'crewai.tasks': MagicMock(),
-            'langchain': MagicMock(),
-            'langchain.chat_models': MagicMock(),
-            'langchain.tools': MagicMock()
-        })
-    ]
-    
-    for p in patches:
-        p.start()
+def isolate_app(controller):
+    """Give each test an empty task and push config store, restoring the previous ones afterwards"""
+    tasks, push_configs = dict(controller.tasks), dict(controller.push_configs)
+    controller.tasks.clear()
+    controller.push_configs.clear()
     
     yield
     
-    for p in patches:
-        p.stop()
-
-@pytest.fixture
-def task_processor():
-    """Fixture for mock task processor"""
-    return MockTaskProcessor()
+    controller.tasks.clear()
+    controller.tasks.update(tasks)
+    controller.push_configs.clear()
+    controller.push_configs.update(push_configs)
 
 @pytest.fixture
-def controller(task_processor):
-    """Create a controller instance for testing"""
-    controller = A2AController()
-    controller.task_processor = task_processor
-    return controller
+def seed_task(controller, task_templates):
+    """Fixture to store a copy of a template task in the controller"""
+    def seed(task_id: str, state: TaskState = TaskState.WORKING) -> Task:
+        template = task_templates[state]
+        # Only the status is copied too, since the controller replaces it on the task
+        task = template.model_copy(
+            update={"id": task_id, "sessionId": fake_uuid(), "status": template.status.model_copy()}
+        )
+        controller.tasks[task_id] = task
+        return task
+    return seed
 
-@pytest.fixture
-def test_client(controller, task_processor):
-    """Fixture for test client with mocked dependencies"""
-    app.dependency_overrides[get_task_processor] = lambda: task_processor
-    
-    # Ensure the controller's router is included in the app
-    app.include_router(controller.router)
-    
-    with TestClient(app) as client:
-        yield client
-    app.dependency_overrides.clear()
-
-@pytest.mark.asyncio
-async def test_generate_script_validation_error(test_client):
-    """Test script generation with invalid request"""
-    # Invalid request that should fail TaskSendParams validation
-    invalid_request = {
-        "id": "test-123",
-        "message": "not a dictionary",  # message debe ser un Dict[str, Any]
-        "sessionId": 123  # sessionId debe ser un string opcional
-    }
-    
-    # Ensure we're hitting the correct endpoint
-    response = test_client.post("/tasks/send", json=invalid_request)
+@pytest.mark.asyncio(loop_scope="module")
+async def test_generate_script_validation_error(client):
+    """Test script generation with a message missing its parts"""
+    response = await client.post("/tasks/send", content=MOCK_INVALID_SEND_BODY, headers=JSON_HEADERS)
     
-    
-    # Log the response for debugging
-    print(f"Response status: {response.status_code}")
-    print(f"Response body: {response.json()}")
+    assert response.status_code == 400
+    assert orjson.loads(response.content)["detail"] == "Missing required A2A fields in params."
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_push_notification_validation_error(client):
+    """Test setting a push config that fails request body validation"""
+    response = await client.post(
+        "/tasks/test-123/pushNotification", content=MOCK_INVALID_PUSH_CONFIG_BODY, headers=JSON_HEADERS
+    )
     
     assert response.status_code == 422
-    error_detail = response.json().get("detail", [])
-    assert any("message" in str(error).lower() for error in error_detail)
+    error_detail = orjson.loads(response.content)["detail"]
+    assert {tuple(error["loc"]) for error in error_detail} == {("body", "url"), ("body", "events")}
 
-@pytest.mark.asyncio
-async def test_generate_script_success(test_client):
+@pytest.mark.asyncio(loop_scope="module")
+async def test_generate_script_success(client, controller):
     """Test successful script generation"""
-    request_data = {
-        "id": "test-123",
-        "message": {
-            "role": "user",
-            "parts": [
-                {
-                    "type": "text",
-                    "text": "Generate a movie script",
-                    "metadata": {
-                        "genre": "comedy",
-                        "tone": "light",
-                        "length": "short"
-                    }
-                }
-            ]
-        },
-        "sessionId": "test-session",
-        "metadata": {
-            "title": "Test Script",
-            "tags": ["test"],
-            "idea": "A test script about testing",
-            "duration": 120
-        }
-    }
-    response = test_client.post("/tasks/send", json=request_data)
+    response = await client.post("/tasks/send", content=MOCK_SEND_BODY, headers=JSON_HEADERS)
     assert response.status_code == 200
-    data = response.json()
+    data = orjson.loads(response.content)
     assert data["id"] == "test-123"
-    assert data["sessionId"] == "test-session"
-    assert data["status"]["state"] == TaskState.SUBMITTED.value
-
-@pytest.mark.asyncio
-async def test_get_task_success(test_client, task_processor):
-    """Test getting a task"""
-    task = task_processor._create_test_task("test-123")
-    response = test_client.get(f"/tasks/{task.id}")
+    task = data["result"]
+    assert task["id"] in controller.tasks
+    assert task["status"]["state"] == TaskState.SUBMITTED
+    assert task["sessionId"] == "test-session"
+
+EXPECTED_WORKING_TASK = ExpectedTask(id="test-123", status=ExpectedStatus(state=TaskState.WORKING))
+EXPECTED_PUSH_CONFIG = ExpectedPushConfig(**MOCK_PUSH_CONFIG)
+
+# (method, path, body, push config set beforehand, adapter, expected payload)
+# for the routes that act on an existing task
+TASK_ROUTE_CASES = [
+    ("GET", "/tasks/{id}", None, False, EXPECTED_TASK_ADAPTER, EXPECTED_WORKING_TASK),
+    ("POST", "/tasks/{id}/cancel", None, False, EXPECTED_TASK_ADAPTER,
+     ExpectedTask(id="test-123", status=ExpectedStatus(state=TaskState.CANCELLED))),
+    ("GET", "/tasks", None, False, EXPECTED_TASK_LIST_ADAPTER, [EXPECTED_WORKING_TASK]),
+    ("POST", "/tasks/{id}/pushNotification", MOCK_PUSH_CONFIG_BODY, False,
+     EXPECTED_PUSH_CONFIG_ADAPTER, EXPECTED_PUSH_CONFIG),
+    ("GET", "/tasks/{id}/pushNotification", None, True,
+     EXPECTED_PUSH_CONFIG_ADAPTER, EXPECTED_PUSH_CONFIG)
+]
+
+@pytest.mark.asyncio(loop_scope="module")
+@pytest.mark.parametrize("method,path,body,push_config,adapter,expected", TASK_ROUTE_CASES,
+                         ids=[f"{method} {path}" for method, path, *_ in TASK_ROUTE_CASES])
+async def test_task_route_success(client, controller, seed_task, method, path, body, push_config, adapter, expected):
+    """Test the task routes against a single existing task"""
+    task = seed_task("test-123")
+    if push_config:
+        controller.push_configs[task.id] = PushNotificationConfig(**MOCK_PUSH_CONFIG)
+    headers = JSON_HEADERS if body is not None else None
+    response = await client.request(method, path.format(id=task.id), content=body, headers=headers)
     assert response.status_code == 200
-    data = response.json()
-    assert data["id"] == task.id
-    assert data["status"]["state"] == TaskState.WORKING.value
-
-@pytest.mark.asyncio
-async def test_get_task_not_found(test_client):
-    """Test getting a non-existent task"""
-    response = test_client.get("/tasks/non-existent")
+    assert_payload(response.content, adapter, expected)
+
+@pytest.mark.asyncio(loop_scope="module")
+@pytest.mark.parametrize("method,path", [
+    ("GET", "/tasks/non-existent"),
+    ("POST", "/tasks/non-existent/cancel")
+])
+async def test_task_route_not_found(client, method, path):
+    """Test the task routes with a non-existent task"""
+    response = await client.request(method, path)
     assert response.status_code == 404
 
-@pytest.mark.asyncio
-async def test_cancel_task_success(test_client, task_processor):
-    """Test cancelling a task"""
-    task = task_processor._create_test_task("test-123")
-    response = test_client.post(f"/tasks/{task.id}/cancel")
+def parse_sse(content: bytes) -> List[Tuple[str, dict]]:
+    """Split an SSE body into (event, decoded data) pairs, checking each frame has exactly those two fields"""
+    assert content.endswith(b"\n\n")
+    events = []
+    for frame in content[:-2].split(b"\n\n"):
+        event, data = frame.split(b"\n")
+        assert event.startswith(b"event: ") and data.startswith(b"data: ")
+        events.append((event[len(b"event: "):].decode(), orjson.loads(data[len(b"data: "):])))
+    return events
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_send_task_streaming_success(client, controller, seed_task, task_templates):
+    """Test the subscribe route streams status updates until the task is cancelled"""
+    task = seed_task("test-123")
+    # Cancel the task while the stream is open so it sends a final update
+    cancelled = task_templates[TaskState.CANCELLED].status
+    asyncio.get_running_loop().call_later(0.1, controller._set_status, task, cancelled)
+    
+    response = await client.get(f"/tasks/{task.id}/subscribe")
     assert response.status_code == 200
-    data = response.json()
-    assert data["id"] == task.id
-    assert data["status"]["state"] == TaskState.CANCELLED.value
-
-@pytest.mark.asyncio
-async def test_cancel_task_not_found(test_client):
-    """Test cancelling a non-existent task"""
-    response = test_client.post("/tasks/non-existent/cancel")
-    assert response.status_code == 404
+    assert response.headers["content-type"].startswith("text/event-stream")
+    updates = [
+        (event, data["id"], data["status"]["state"], data["final"])
+        for event, data in parse_sse(response.content)
+    ]
+    assert updates == [
+        ("status_update", task.id, TaskState.WORKING, False),
+        ("status_update", task.id, TaskState.CANCELLED, True)
+    ]
 
-@pytest.mark.asyncio
-async def test_list_tasks_success(test_client, task_processor):
-    """Test listing tasks"""
-    task = task_processor._create_test_task("test-123")
-    response = test_client.get("/tasks")
-    assert response.status_code == 200
-    data = response.json()
-    assert len(data) == 1
-    assert data[0]["id"] == task.id
-
-@pytest.mark.asyncio
-async def test_set_push_notification(test_client, task_processor):
-    """Test setting push notification"""
-    task = task_processor._create_test_task("test-123")
-    response = test_client.post(f"/tasks/{task.id}/push", json=MOCK_PUSH_CONFIG)
+@pytest.mark.asyncio(loop_scope="module")
+async def test_send_task_streaming_failed(client, seed_task):
+    """Test the subscribe route ends a failed task's stream with a -32500 error event"""
+    task = seed_task("test-123", TaskState.FAILED)
+    response = await client.get(f"/tasks/{task.id}/subscribe")
     assert response.status_code == 200
-    data = response.json()
-    assert data["url"] == MOCK_PUSH_CONFIG["url"]
-    assert data["events"] == MOCK_PUSH_CONFIG["events"]
-
-@pytest.mark.asyncio
-async def test_get_push_notification(test_client, task_processor):
-    """Test getting push notification"""
-    task = task_processor._create_test_task("test-123")
-    await task_processor.set_push_notification(task.id, PushNotificationConfig(**MOCK_PUSH_CONFIG))
-    response = test_client.get(f"/tasks/{task.id}/push")
-    assert response.status_code == 200
-    data = response.json()
-    assert data["url"] == MOCK_PUSH_CONFIG["url"]
-    assert data["events"] == MOCK_PUSH_CONFIG["events"]
-
-@pytest.mark.asyncio
-async def test_send_task_streaming_success(test_client, task_processor):
-    """Test successful streaming task updates"""
-    task = task_processor._create_test_task("test-123")
-    with test_client.websocket_connect(f"/tasks/{task.id}/stream") as websocket:
-        # Simulate task updates
-        await task_processor._task_updates[task.id].put(task)
-        task.status.state = TaskState.COMPLETED
-        await task_processor._task_updates[task.id].put(task)
-        
-        # Receive updates
-        data = websocket.receive_json()
-        assert data["id"] == task.id
-        assert data["status"]["state"] == TaskState.WORKING.value
-        
-        data = websocket.receive_json()
-        assert data["id"] == task.id
-        assert data["status"]["state"] == TaskState.COMPLETED.value
-
-@pytest.mark.asyncio
-async def test_send_task_streaming_error(test_client):
-    """Test streaming updates for non-existent task"""
-    with pytest.raises(WebSocketDisconnect):
-        with test_client.websocket_connect("/tasks/non-existent/stream"):
-            pass
\ No newline at end of file
+    assert parse_sse(response.content) == [
+        ("error", {"id": task.id, "error": {"code": -32500, "message": "Test task"}})
+    ]
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_send_task_streaming_error(client):
+    """Test subscribing to a non-existent task"""
+    response = await client.get("/tasks/non-existent/subscribe")
+    assert response.status_code == 404
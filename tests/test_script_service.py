@@ -4,7 +4,21 @@ Unit tests for the ScriptService class
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from src.core.script_service import ScriptService
-import json
+import orjson
+
+# Model replies for the outline and script requests, encoded once
+OUTLINE_DATA = {
+    "outline": "Test outline",
+    "scenes": ["Scene 1", "Scene 2"],
+    "metadata": {"genre": "test"}
+}
+SCRIPT_DATA = {
+    "script": "Test script",
+    "scenes": ["Scene 1", "Scene 2"],
+    "metadata": {"genre": "test"}
+}
+OUTLINE_JSON = orjson.dumps(OUTLINE_DATA).decode()
+SCRIPT_JSON = orjson.dumps(SCRIPT_DATA).decode()
 
 @pytest.fixture
 def script_service():
@@ -27,27 +41,22 @@ async def test_generate_script_success(script_service):
     @param {ScriptService} script_service - The mocked script service instance
     """
     # Mock responses
-    outline_data = {
-        "outline": "Test outline",
-        "scenes": ["Scene 1", "Scene 2"],
-        "metadata": {"genre": "test"}
-    }
-    script_data = {
-        "script": "Test script",
-        "scenes": ["Scene 1", "Scene 2"],
-        "metadata": {"genre": "test"}
-    }
-    
     outline_response = MagicMock()
-    outline_response.choices = [MagicMock(message=MagicMock(content=json.dumps(outline_data)))]
+    outline_response.choices = [MagicMock(message=MagicMock(content=OUTLINE_JSON))]
     
     script_response = MagicMock()
-    script_response.choices = [MagicMock(message=MagicMock(content=json.dumps(script_data)))]
+    script_response.choices = [MagicMock(message=MagicMock(content=SCRIPT_JSON))]
+    
+    async def create_completion(model, messages, temperature):
+        """
+        Answer by request rather than by call order: the outline request is the
+        only one without an assistant turn carrying the outline
+        """
+        if any(message["role"] == "assistant" for message in messages):
+            return script_response
+        return outline_response
     
-    script_service.client.chat.completions.create.side_effect = [
-        outline_response,
-        script_response
-    ]
+    script_service.client.chat.completions.create.side_effect = create_completion
     
     # Test data
     prompt = {
@@ -67,8 +76,8 @@ async def test_generate_script_success(script_service):
     
     # Verify script data - should be a JSON string
     assert isinstance(script_result, str)
-    parsed_script = json.loads(script_result)
-    assert parsed_script == script_data
+    parsed_script = orjson.loads(script_result)
+    assert parsed_script == SCRIPT_DATA
     
     # Verify thoughts
     assert isinstance(thoughts, list)
@@ -76,7 +85,7 @@ async def test_generate_script_success(script_service):
     
     # Verify outline thought
     assert thoughts[0]["type"] == "outline"
-    assert thoughts[0]["content"] == json.dumps(outline_data)
+    assert thoughts[0]["content"] == OUTLINE_JSON
     
     # Verify completion thought - should be plain text
     assert thoughts[1]["type"] == "completion"
@@ -2,294 +2,278 @@
 Unit tests for the FastAPI server
 """
 import pytest
-from fastapi.testclient import TestClient
-from unittest.mock import patch, AsyncMock, MagicMock
-import json
+import pytest_asyncio
+import httpx
+from unittest.mock import patch, MagicMock
+import orjson
 import uuid
-from datetime import datetime
+import itertools
+import asyncio
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
 
-from src.server import app, get_task_processor
-from src.models.task import Task, TaskStatus, Message, TaskState, TextPart
-from src.models.a2a import PushNotificationConfig
+from src.api.app import app
+from src.controllers.a2a_controller import controller
+from src.models.agent_card import AGENT_CARD
+from src.models.task import TaskStatus, Message, TaskState, TextPart
+from src.models.a2a import Task, PushNotificationConfig
 
-# Create test client
-client = TestClient(app)
+# Fixed status timestamp for test tasks; no test checks the time itself
+FIXED_TIMESTAMP = "2024-01-01T00:00:00"
 
-@pytest.fixture
-def mock_task_processor():
+# Sequential ids for test tasks, cheaper than uuid4 and reproducible across runs
+_fake_uuids = itertools.count(1)
+
+def fake_uuid() -> str:
+    """Return the next sequential UUID string"""
+    return str(uuid.UUID(int=next(_fake_uuids)))
+
+# Request payloads shared by the tests, serialized once for HTTP posts
+TEST_TASK_PARAMS = {
+    "sessionId": fake_uuid(),
+    "message": {
+        "role": "user",
+        "parts": [{
+            "type": "text",
+            "text": "Test message"
+        }]
+    },
+    "metadata": {
+        "title": "Test Script",
+        "tags": ["test"],
+        "idea": "Test idea"
+    }
+}
+TEST_TASK_REQUEST = {
+    "jsonrpc": "2.0",
+    "id": fake_uuid(),
+    "method": "tasks/send",
+    "params": TEST_TASK_PARAMS
+}
+TEST_TASK_BODY = orjson.dumps(TEST_TASK_REQUEST)
+# Same request without the movie script parameters, rejected by /tasks/send
+TEST_INVALID_TASK_BODY = orjson.dumps({
+    **TEST_TASK_REQUEST,
+    "params": {**TEST_TASK_PARAMS, "metadata": {}}
+})
+TEST_PUSH_CONFIG = {
+    "url": "https://test.com/webhook",
+    "events": ["status", "artifact"]
+}
+TEST_PUSH_CONFIG_BODY = orjson.dumps(TEST_PUSH_CONFIG)
+JSON_HEADERS = {"content-type": "application/json"}
+
+@lru_cache(maxsize=None)
+def task_template(state: TaskState, text: str) -> Task:
     """
-    Create a mock task processor for testing
+    Build a validated task once per (state, message text); callers copy it
+    with the ids they need instead of validating a new Task tree
     """
-    processor = MagicMock()
-    
-    async def mock_create_task(task_params):
-        """
-        Mock implementation of create_task
-        """
-        return Task(
-            id=task_params["id"],
-            status=TaskStatus(
-                state=TaskState.SUBMITTED,
-                timestamp=datetime.utcnow().isoformat(),
-                message=Message(
-                    role="assistant",
-                    parts=[TextPart(
-                        text="Task submitted",
-                        type="text"
-                    )]
-                )
-            )
-        )
-    
-    async def mock_process_task_async(task_id):
-        """
-        Mock implementation of process_task_async
-        """
-        pass
-    
-    async def mock_get_task_updates(task_id):
-        """
-        Mock implementation of get_task_updates
-        """
-        # Initial working state
-        yield Task(
-            id=task_id,
-            status=TaskStatus(
-                state=TaskState.WORKING,
-                timestamp=datetime.utcnow().isoformat(),
-                message=Message(
-                    role="assistant",
-                    parts=[TextPart(
-                        text="Processing task...",
-                        type="text"
-                    )]
-                )
-            )
-        )
-        
-        # Final completed state
-        yield Task(
-            id=task_id,
-            status=TaskStatus(
-                state=TaskState.COMPLETED,
-                timestamp=datetime.utcnow().isoformat(),
-                message=Message(
-                    role="assistant",
-                    parts=[TextPart(
-                        text="Task completed",
-                        type="text"
-                    )]
-                )
-            )
-        )
-    
-    async def mock_get_task(task_id: str):
-        if task_id == "nonexistent":
-            raise ValueError("Task not found")
-        return Task(
-            id=task_id,
-            sessionId=str(uuid.uuid4()),
-            status=TaskStatus(
-                state=TaskState.COMPLETED,
-                timestamp=datetime.utcnow().isoformat(),
-                message=Message(
-                    role="assistant",
-                    parts=[TextPart(
-                        text="Task completed",
-                        type="text"
-                    )]
-                )
-            )
-        )
-    
-    async def mock_cancel_task(task_id: str):
-        return Task(
-            id=task_id,
-            sessionId=str(uuid.uuid4()),
-            status=TaskStatus(
-                state=TaskState.CANCELLED,
-                timestamp=datetime.utcnow().isoformat(),
-                message=Message(
-                    role="assistant",
-                    parts=[TextPart(type="text", text="Task cancelled")]
-                )
+    return Task(
+        id="template",
+        status=TaskStatus(
+            state=state,
+            timestamp=FIXED_TIMESTAMP,
+            message=Message(
+                role="assistant",
+                parts=[TextPart(type="text", text=text)]
             )
         )
-    
-    async def mock_set_push_notification(task_id: str, config: PushNotificationConfig):
-        return config
-    
-    async def mock_get_push_notification(task_id: str):
-        if task_id == "nonexistent":
-            return None
-        return PushNotificationConfig(
-            url="https://test.com/webhook",
-            events=["status", "artifact"]
-        )
-    
-    processor.create_task = mock_create_task
-    processor.process_task_async = mock_process_task_async
-    processor.get_task_updates = mock_get_task_updates
-    processor.get_task = mock_get_task
-    processor.cancel_task = mock_cancel_task
-    processor.set_push_notification = mock_set_push_notification
-    processor.get_push_notification = mock_get_push_notification
-    return processor
+    )
 
-@pytest.fixture
-def test_client(mock_task_processor):
+def seed_task(task_id: str, state: TaskState, text: str) -> Task:
     """
-    Create a test client with mocked dependencies
+    Store a copy of the task template for (state, text) in the controller
     """
-    app.dependency_overrides[get_task_processor] = lambda: mock_task_processor
-    return TestClient(app)
+    task = task_template(state, text).model_copy(update={"id": task_id, "sessionId": fake_uuid()})
+    controller.tasks[task_id] = task
+    return task
 
-def create_test_message():
+def parse_sse(content: bytes) -> List[Tuple[str, Dict[str, Any]]]:
     """
-    Helper function to create a test message
+    Split an SSE response body into (event, decoded data) pairs
     """
-    return {
-        "role": "user",
-        "parts": [{
-            "type": "text",
-            "text": "Test message"
-        }]
-    }
+    events = []
+    for block in content.split(b"\n\n"):
+        if block:
+            fields = dict(line.split(b": ", 1) for line in block.splitlines())
+            events.append((fields[b"event"].decode(), orjson.loads(fields[b"data"])))
+    return events
 
-def create_test_task_params():
+def background_processing() -> List[asyncio.Task]:
     """
-    Helper function to create test task parameters
+    Get the pending tasks started by the controller to process sent tasks
     """
-    return {
-        "id": str(uuid.uuid4()),
-        "sessionId": str(uuid.uuid4()),
-        "message": create_test_message(),
-        "metadata": {}
-    }
+    name = controller._process_task.__qualname__
+    return [task for task in asyncio.all_tasks() if task.get_coro().__qualname__ == name]
 
-def test_get_agent_card():
+@pytest_asyncio.fixture(loop_scope="module")
+async def isolated_controller():
+    """
+    Give a single test an empty task and push config store, with the
+    script generator mocked out for tasks processed in the background
+    """
+    tasks, push_configs = dict(controller.tasks), dict(controller.push_configs)
+    controller.tasks.clear()
+    controller.push_configs.clear()
+    
+    with patch.object(controller, "generator", MagicMock()):
+        yield controller
+        # Let the tasks sent by the test finish while the generator is still mocked
+        await asyncio.gather(*background_processing())
+    
+    controller.tasks.clear()
+    controller.tasks.update(tasks)
+    controller.push_configs.clear()
+    controller.push_configs.update(push_configs)
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def shared_async_client():
+    """
+    Create an in-process ASGI client shared by the module
+    """
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as async_client:
+        yield async_client
+
+@pytest.fixture
+def async_client(shared_async_client, isolated_controller):
+    """
+    Get the shared ASGI client with an isolated controller
+    """
+    return shared_async_client
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_get_agent_card(shared_async_client):
     """
     Test retrieving the agent card
     """
-    with patch('builtins.open', create=True) as mock_open:
-        mock_open.return_value.__enter__.return_value.read.return_value = json.dumps({
-            "name": "Movie Script Generator Agent",
-            "version": "1.0.0"
-        })
-        
-        response = client.get("/.well-known/agent.json")
+    # Patch only the card the controller serves, not every open() in the process
+    with patch('src.controllers.a2a_controller.AGENT_CARD', {
+        "name": "Movie Script Generator Agent",
+        "version": "1.0.0"
+    }):
+        response = await shared_async_client.get("/.well-known/agent.json")
         assert response.status_code == 200
-        assert response.json()["name"] == "Movie Script Generator Agent"
+        assert orjson.loads(response.content)["name"] == "Movie Script Generator Agent"
 
-def test_get_agent_card_not_found():
+@pytest.mark.asyncio(loop_scope="module")
+async def test_get_agent_card_default(shared_async_client):
     """
-    Test retrieving non-existent agent card
+    Test retrieving the agent card the controller serves by default
     """
-    response = client.get("/.well-known/agent.json")
-    assert response.status_code == 404
+    response = await shared_async_client.get("/.well-known/agent.json")
+    assert response.status_code == 200
+    assert orjson.loads(response.content)["name"] == AGENT_CARD.name
 
-def test_send_task_success(test_client):
+@pytest.mark.asyncio(loop_scope="module")
+async def test_send_task_success(async_client):
     """
     Test successful task submission
     """
-    params = create_test_task_params()
-    response = test_client.post("/tasks/send", json=params)
+    response = await async_client.post("/tasks/send", content=TEST_TASK_BODY, headers=JSON_HEADERS)
     
     assert response.status_code == 200
-    data = response.json()
-    assert data["id"] == params["id"]
-    assert data["status"]["state"] == TaskState.SUBMITTED
-    assert "message" in data["status"]
+    data = orjson.loads(response.content)
+    assert data["id"] == TEST_TASK_REQUEST["id"]
+    assert data["result"]["id"] in controller.tasks
+    assert data["result"]["status"]["state"] == TaskState.SUBMITTED
+    assert "message" in data["result"]["status"]
 
-def test_send_task_error(test_client, mock_task_processor):
+@pytest.mark.asyncio(loop_scope="module")
+async def test_send_task_error(async_client):
     """
-    Test task submission with error
+    Test task submission without the movie script parameters
     """
-    async def mock_error_task(_):
-        raise ValueError("Test error")
+    response = await async_client.post("/tasks/send", content=TEST_INVALID_TASK_BODY, headers=JSON_HEADERS)
     
-    mock_task_processor.create_task = mock_error_task
-    params = create_test_task_params()
-    response = test_client.post("/tasks/send", json=params)
-    
-    assert response.status_code == 500
-    assert response.json()["detail"] == "Test error"
+    assert response.status_code == 400
+    assert orjson.loads(response.content)["detail"] == (
+        "Missing required movie script parameters in metadata (title, tags, idea)."
+    )
+    assert not controller.tasks
 
-def test_get_task_success(test_client):
+@pytest.mark.asyncio(loop_scope="module")
+async def test_get_task_success(async_client):
     """
     Test successful task retrieval
     """
-    response = test_client.get("/tasks/test-123")
+    seed_task("test-123", TaskState.COMPLETED, "Task completed")
+    response = await async_client.get("/tasks/test-123")
     assert response.status_code == 200
-    data = response.json()
+    data = orjson.loads(response.content)
     assert data["id"] == "test-123"
     assert data["status"]["state"] == TaskState.COMPLETED
 
-def test_get_task_not_found(test_client):
+@pytest.mark.asyncio(loop_scope="module")
+async def test_get_task_not_found(async_client):
     """
     Test task retrieval for non-existent task
     """
-    response = test_client.get("/tasks/nonexistent")
+    response = await async_client.get("/tasks/nonexistent")
     assert response.status_code == 404
 
-@pytest.mark.asyncio
-async def test_cancel_task_success(test_client):
+@pytest.mark.asyncio(loop_scope="module")
+async def test_cancel_task_success(async_client):
     """
     Test successful task cancellation
     """
-    response = test_client.post("/tasks/test-123/cancel")
+    seed_task("test-123", TaskState.WORKING, "Processing task...")
+    response = await async_client.post("/tasks/test-123/cancel")
     assert response.status_code == 200
-    data = response.json()
+    data = orjson.loads(response.content)
     assert data["id"] == "test-123"
     assert data["status"]["state"] == TaskState.CANCELLED
 
-def test_send_task_subscribe(test_client):
-    """
-    Test task submission with streaming response
-    """
-    params = create_test_task_params()
-    with test_client.websocket_connect(f"/tasks/sendSubscribe") as websocket:
-        websocket.send_json(params)
-        
-        # Check initial state
-        data = websocket.receive_json()
-        assert data["event"] == "update"
-        task_data = json.loads(data["data"])
-        assert task_data["status"]["state"] == TaskState.WORKING
-        
-        # Check final state
-        data = websocket.receive_json()
-        assert data["event"] == "update"
-        task_data = json.loads(data["data"])
-        assert task_data["status"]["state"] == TaskState.COMPLETED
+@pytest.mark.asyncio(loop_scope="module")
+async def test_send_task_subscribe(async_client):
+    """
+    Test the task updates streamed by the subscribe route
+    """
+    task = seed_task("test-123", TaskState.WORKING, "Processing task...")
+    # Cancel the task while the stream is open so it sends a final update
+    cancelled = task_template(TaskState.CANCELLED, "Task cancelled").status
+    asyncio.get_running_loop().call_later(0.1, controller._set_status, task, cancelled)
+    
+    response = await async_client.get(f"/tasks/{task.id}/subscribe")
+    assert response.status_code == 200
+    states = [
+        (event, data["id"], data["status"]["state"], data["final"])
+        for event, data in parse_sse(response.content)
+    ]
+    assert states == [
+        ("status_update", task.id, TaskState.WORKING, False),
+        ("status_update", task.id, TaskState.CANCELLED, True)
+    ]
 
-def test_set_push_notification(test_client):
+@pytest.mark.asyncio(loop_scope="module")
+async def test_set_push_notification(async_client):
     """
     Test setting push notification configuration
     """
-    config = {
-        "url": "https://test.com/webhook",
-        "events": ["status", "artifact"]
-    }
-    response = test_client.post("/tasks/test-123/pushNotification", json=config)
+    seed_task("test-123", TaskState.WORKING, "Processing task...")
+    response = await async_client.post("/tasks/test-123/pushNotification", content=TEST_PUSH_CONFIG_BODY, headers=JSON_HEADERS)
     assert response.status_code == 200
-    data = response.json()
-    assert data["url"] == config["url"]
-    assert data["events"] == config["events"]
+    data = orjson.loads(response.content)
+    assert data["url"] == TEST_PUSH_CONFIG["url"]
+    assert data["events"] == TEST_PUSH_CONFIG["events"]
 
-def test_get_push_notification_success(test_client):
+@pytest.mark.asyncio(loop_scope="module")
+async def test_get_push_notification_success(async_client):
     """
     Test getting push notification configuration
     """
-    response = test_client.get("/tasks/test-123/pushNotification")
+    seed_task("test-123", TaskState.WORKING, "Processing task...")
+    controller.push_configs["test-123"] = PushNotificationConfig(**TEST_PUSH_CONFIG)
+    response = await async_client.get("/tasks/test-123/pushNotification")
     assert response.status_code == 200
-    data = response.json()
+    data = orjson.loads(response.content)
     assert data["url"] == "https://test.com/webhook"
     assert "status" in data["events"]
 
-def test_get_push_notification_not_found(test_client):
+@pytest.mark.asyncio(loop_scope="module")
+async def test_get_push_notification_not_found(async_client):
     """
     Test getting non-existent push notification configuration
     """
-    response = test_client.get("/tasks/nonexistent/pushNotification")
+    response = await async_client.get("/tasks/nonexistent/pushNotification")
     assert response.status_code == 404 
\ No newline at end of file
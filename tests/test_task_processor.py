@@ -2,75 +2,178 @@
 Unit tests for the TaskProcessor class
 """
 import pytest
-from unittest.mock import AsyncMock, patch, MagicMock
-from datetime import datetime
-import json
+from unittest.mock import patch
 import asyncio
-import logging
+from src.core import task_processor as task_processor_module
 from src.core.task_processor import TaskProcessor
-from src.models.task import Task, TaskStatus, Message, Artifact, TextPart, TaskState
+from src.models.task import Task, TaskStatus, Message, TextPart, TaskState
 from src.models.a2a import PushNotificationConfig
 import uuid
+import itertools
+from collections import deque
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
-logger = logging.getLogger(__name__)
+# Fixed status timestamp for test tasks; no test checks the time itself
+FIXED_TIMESTAMP = "2024-01-01T00:00:00"
 
-@pytest.fixture
-def task_processor():
+# Sequential ids for test tasks, cheaper than uuid4 and reproducible across runs
+_fake_uuids = itertools.count(1)
+
+def fake_uuid() -> str:
+    """Return the next sequential UUID string"""
+    return str(uuid.UUID(int=next(_fake_uuids)))
+
+class FakeScriptService:
     """
-    Create a TaskProcessor instance with mocked ScriptService
+    Lightweight stand-in for ScriptService that records its calls
+    """
+    
+    def __init__(self):
+        self.return_value = None
+        self.side_effect = None
+        self.calls = []
     
-    @returns {TaskProcessor} A TaskProcessor instance with mocked ScriptService
+    async def generate_script(self, prompt, metadata=None):
+        """
+        Record the call, then raise side_effect if set or return return_value
+        
+        @param {str} prompt - The script prompt
+        @param {dict} metadata - The script metadata
+        @returns {tuple} The configured return value
+        """
+        self.calls.append((prompt, metadata))
+        if self.side_effect:
+            raise self.side_effect
+        return self.return_value
+
+class UpdateBuffer:
     """
-    with patch('src.core.task_processor.ScriptService') as mock_script_service:
-        processor = TaskProcessor()
-        # Mock the script service methods
-        processor._script_service.generate_script = AsyncMock()
-        yield processor
+    Plain FIFO stand-in for the update queue in tests that never read the stream
+    """
+    
+    def __init__(self):
+        self._items = deque()
+    
+    async def put(self, item):
+        """
+        Append an update; the buffer is unbounded so this never waits
+        
+        @param {Task} item - The task update
+        """
+        self._items.append(item)
+    
+    def get_nowait(self):
+        """
+        Pop the oldest update
+        
+        @returns {Task} The oldest queued update
+        """
+        if not self._items:
+            raise asyncio.QueueEmpty
+        return self._items.popleft()
+    
+    def qsize(self):
+        """
+        @returns {int} The number of queued updates
+        """
+        return len(self._items)
 
-def create_test_task():
+@pytest.fixture(scope="module", autouse=True)
+def stub_script_service():
     """
-    Creates a test task with proper metadata configuration
+    Replace the ScriptService class once for the whole module, so each
+    TaskProcessor gets a fresh FakeScriptService instead of a real OpenAI client
+    """
+    with patch.object(task_processor_module, 'ScriptService', FakeScriptService):
+        yield
+
+@pytest.fixture
+def task_processor():
+    """
+    Create a TaskProcessor instance with a fake ScriptService
     
-    @returns {Task} A configured test task instance
+    @returns {TaskProcessor} A TaskProcessor instance with a FakeScriptService
     """
-    task_metadata = {
+    return TaskProcessor()
+
+# Push notification config shared by the push tests, which only read it
+PUSH_CONFIG = PushNotificationConfig(
+    url="https://test.com/webhook",
+    events=["status", "artifact"]
+)
+
+# Canonical test task, validated once and copied by create_test_task
+TEMPLATE_TASK = Task(
+    id="template-task",
+    status=TaskStatus(
+        state=TaskState.SUBMITTED,
+        timestamp=FIXED_TIMESTAMP,
+        message=Message(
+            role="user",
+            parts=[
+                TextPart(
+                    type="text",
+                    text="Generate a test script",
+                    metadata={
+                        "data": {
+                            "genre": "test",
+                            "tone": "neutral",
+                            "length": "short"
+                        }
+                    }
+                )
+            ]
+        )
+    ),
+    metadata={
         "title": "Test Script",
         "genre": "test",
         "tone": "neutral",
         "length": "short",
         "tags": ["test"]
-    }
+    },
+    artifacts=[]
+)
+
+def create_test_task():
+    """
+    Creates a test task with proper metadata configuration
     
-    message_metadata = {
-        "data": {
-            "genre": "test",
-            "tone": "neutral",
-            "length": "short"
-        }
-    }
+    The template is copied without re-validation; the status and the lists
+    the processor appends to are copied too, since tests mutate them
     
-    return Task(
-        id=str(uuid.uuid4()),
-        sessionId=str(uuid.uuid4()),
-        status=TaskStatus(
-            state=TaskState.SUBMITTED,
-            timestamp=datetime.utcnow().isoformat(),
-            message=Message(
-                role="user",
-                parts=[
-                    TextPart(
-                        type="text",
-                        text="Generate a test script",
-                        metadata=message_metadata
-                    )
-                ]
-            )
-        ),
-        metadata=task_metadata,
-        artifacts=[]
-    )
+    @returns {Task} A configured test task instance
+    """
+    return TEMPLATE_TASK.model_copy(update={
+        "id": fake_uuid(),
+        "sessionId": fake_uuid(),
+        "status": TEMPLATE_TASK.status.model_copy(),
+        "artifacts": [],
+        "history": []
+    })
+
+@pytest.fixture
+def stored_task(task_processor):
+    """
+    Store a test task in the processor with an update buffer
+    
+    @param {TaskProcessor} task_processor - The task processor instance
+    @returns {tuple} The task processor and the stored task
+    """
+    task = create_test_task()
+    task_processor._tasks[task.id] = task
+    task_processor._task_updates[task.id] = UpdateBuffer()
+    return task_processor, task
+
+def drain_updates(task_processor, task_id):
+    """
+    Takes every update queued for a task without awaiting the queue
+    
+    @param {TaskProcessor} task_processor - The task processor holding the queue
+    @param {str} task_id - The task whose updates are drained
+    @returns {list} The queued updates, oldest first
+    """
+    queue = task_processor._task_updates[task_id]
+    return [queue.get_nowait() for _ in range(queue.qsize())]
 
 @pytest.mark.asyncio
 async def test_create_task(task_processor):
@@ -110,207 +213,129 @@ async def test_create_task(task_processor):
     assert isinstance(task_processor._task_updates[task.id], asyncio.Queue)
 
 @pytest.mark.asyncio
-async def test_process_task_script_generation(task_processor):
+async def test_process_task_script_generation(stored_task):
     """
     Tests the processing of a script generation task
     
-    @param {TaskProcessor} task_processor - The task processor fixture
+    @param {tuple} stored_task - The task processor and its stored test task
     """
-    try:
-        # Mock script service response
-        script_content = "Test script content"
-        thoughts = [
-            {"type": "outline", "content": "Test outline"},
-            {"type": "completion", "content": "Script generated successfully"}
-        ]
-        
-        task_processor._script_service.generate_script.return_value = (script_content, thoughts)
-        
-        # Create and store test task
-        task = create_test_task()
-        task_processor._tasks[task.id] = task
-        task_processor._task_updates[task.id] = asyncio.Queue()
-        
-        # Start task processing
-        process_task = asyncio.create_task(
-            task_processor.process_task_async(task.id)
-        )
-        
-        # Collect updates until task is done
-        updates = []
-        try:
-            while True:
-                update = await asyncio.wait_for(
-                    task_processor._task_updates[task.id].get(),
-                    timeout=1
-                )
-                updates.append(update)
-                if update.status.state in [TaskState.COMPLETED, TaskState.FAILED]:
-                    break
-        except asyncio.TimeoutError:
-            logging.error("Timeout waiting for task updates")
-            if process_task.done():
-                exc = process_task.exception()
-                if exc:
-                    logging.error(f"Task failed with error: {exc}")
-            raise
-            
-        # Verify updates were received
-        assert len(updates) > 0, "No updates received"
-        
-        # Get final task state
-        final_update = updates[-1]
-        assert final_update.status.state == TaskState.COMPLETED
-        
-        # Verify script artifacts
-        task = task_processor._tasks[task.id]
-        assert len(task.artifacts) == 3, "Expected outline, script and thoughts artifacts"
-        
-        # Verify outline artifact
-        outline_artifact = next((a for a in task.artifacts if a.name == "outline"), None)
-        assert outline_artifact is not None
-        assert outline_artifact.description == "Script outline"
-        assert outline_artifact.parts[0].text == "Test outline"
-        
-        # Verify script artifact
-        script_artifact = next((a for a in task.artifacts if a.name == "script"), None)
-        assert script_artifact is not None
-        assert script_artifact.description == "Generated script"
-        assert script_artifact.parts[0].text == "Test script content"
-        
-        # Verify thoughts artifact
-        thoughts_artifact = next((a for a in task.artifacts if a.name == "thoughts"), None)
-        assert thoughts_artifact is not None
-        assert thoughts_artifact.description == "Processing thoughts and insights"
-        
-        # Verify script service was called with correct metadata
-        script_service_call = task_processor._script_service.generate_script.call_args
-        assert script_service_call is not None
-        prompt_arg, metadata_arg = script_service_call[0]
-        assert prompt_arg == task.status.message.parts[0].text
-        assert metadata_arg == task.status.message.parts[0].metadata["data"]
-        
-    finally:
-        if 'process_task' in locals():
-            process_task.cancel()
-            try:
-                await process_task
-            except asyncio.CancelledError:
-                pass
+    task_processor, task = stored_task
+    
+    # Mock script service response
+    script_content = "Test script content"
+    thoughts = [
+        {"type": "outline", "content": "Test outline"},
+        {"type": "completion", "content": "Script generated successfully"}
+    ]
+    
+    task_processor._script_service.return_value = (script_content, thoughts)
+    original_message = task.status.message
+    
+    # Process the task to completion, then collect its updates
+    await task_processor.process_task_async(task.id)
+    updates = drain_updates(task_processor, task.id)
+    
+    # Verify updates were received
+    assert len(updates) > 0, "No updates received"
+    
+    # Get final task state
+    final_update = updates[-1]
+    assert final_update.status.state == TaskState.COMPLETED
+    
+    # Verify script artifacts
+    task = task_processor._tasks[task.id]
+    assert len(task.artifacts) == 3, "Expected outline, script and thoughts artifacts"
+    artifacts_by_name = {a.name: a for a in task.artifacts}
+    
+    # Verify outline artifact
+    outline_artifact = artifacts_by_name.get("outline")
+    assert outline_artifact is not None
+    assert outline_artifact.description == "Script outline"
+    assert outline_artifact.parts[0].text == "Test outline"
+    
+    # Verify script artifact
+    script_artifact = artifacts_by_name.get("script")
+    assert script_artifact is not None
+    assert script_artifact.description == "Generated script"
+    assert script_artifact.parts[0].text == "Test script content"
+    
+    # Verify thoughts artifact
+    thoughts_artifact = artifacts_by_name.get("thoughts")
+    assert thoughts_artifact is not None
+    assert thoughts_artifact.description == "Processing thoughts and insights"
+    
+    # Verify script service was called with correct metadata
+    assert task_processor._script_service.calls
+    prompt_arg, metadata_arg = task_processor._script_service.calls[-1]
+    assert prompt_arg == original_message.parts[0].text
+    assert metadata_arg == original_message.parts[0].metadata["data"]
 
 @pytest.mark.asyncio
-async def test_process_task_error(task_processor):
+async def test_process_task_error(stored_task):
     """
     Test processing a task that results in error
     
-    @param {TaskProcessor} task_processor - The mocked task processor instance
+    @param {tuple} stored_task - The task processor and its stored test task
     """
-    logger.info("Starting error test")
-    process_task = None
+    task_processor, task = stored_task
     
-    try:
-        # Mock script service error
-        error_message = "Service error"
-        task_processor._script_service.generate_script.side_effect = Exception(error_message)
-        logger.debug("Mocked service error")
-        
-        # Create and store test task
-        task = create_test_task()
-        original_message = task.status.message
-        task_processor._tasks[task.id] = task
-        task_processor._task_updates[task.id] = asyncio.Queue()
-        logger.debug("Created test task")
-        
-        # Start task processing
-        logger.info("Starting task processing")
-        process_task = asyncio.create_task(task_processor.process_task_async(task.id))
-        logger.debug("Task processing started")
-        
-        # Get all updates until we see FAILED
-        updates = []
-        try:
-            while True:
-                update = await asyncio.wait_for(task_processor._task_updates[task.id].get(), timeout=2.0)
-                logger.info(f"Received update with state: {update.status.state}")
-                updates.append(update)
-                if update.status.state == TaskState.FAILED:
-                    break
-        except asyncio.TimeoutError:
-            logger.error("Timeout waiting for updates")
-            if process_task.done():
-                exc = process_task.exception()
-                if exc:
-                    logging.error(f"Task failed with error: {exc}")
-            raise
-        
-        # Verify we got at least one update and it's FAILED
-        assert len(updates) > 0, "No updates received"
-        final_update = updates[-1]
-        assert final_update.status.state == TaskState.FAILED
-        
-        # Verify error message
-        assert final_update.status.message is not None
-        assert final_update.status.message.role == "agent"
-        assert len(final_update.status.message.parts) == 1
-        error_part = final_update.status.message.parts[0]
-        assert isinstance(error_part, TextPart)
-        assert error_part.type == "text"
-        assert error_message in error_part.text
-        logger.info("Verified FAILED state")
-        
-        # Verify script service was called with correct metadata from original message
-        script_service_call = task_processor._script_service.generate_script.call_args
-        assert script_service_call is not None
-        prompt_arg, metadata_arg = script_service_call[0]
-        assert prompt_arg == original_message.parts[0].text
-        assert metadata_arg == original_message.parts[0].metadata["data"]
-        
-    finally:
-        if process_task and not process_task.done():
-            process_task.cancel()
-            try:
-                await process_task
-            except asyncio.CancelledError:
-                pass
+    # Mock script service error
+    error_message = "Service error"
+    task_processor._script_service.side_effect = Exception(error_message)
+    
+    original_message = task.status.message
+    
+    # Process the task to completion, then collect its updates
+    await task_processor.process_task_async(task.id)
+    updates = drain_updates(task_processor, task.id)
+    
+    # Verify we got at least one update and it's FAILED
+    assert len(updates) > 0, "No updates received"
+    final_update = updates[-1]
+    assert final_update.status.state == TaskState.FAILED
+    
+    # Verify error message
+    assert final_update.status.message is not None
+    assert final_update.status.message.role == "agent"
+    assert len(final_update.status.message.parts) == 1
+    error_part = final_update.status.message.parts[0]
+    assert isinstance(error_part, TextPart)
+    assert error_part.type == "text"
+    assert error_message in error_part.text
+    
+    # Verify script service was called with correct metadata from original message
+    assert task_processor._script_service.calls
+    prompt_arg, metadata_arg = task_processor._script_service.calls[-1]
+    assert prompt_arg == original_message.parts[0].text
+    assert metadata_arg == original_message.parts[0].metadata["data"]
 
 @pytest.mark.asyncio
-async def test_get_task_updates(task_processor):
+async def test_get_task_updates(stored_task):
     """
     Test getting task updates via streaming
     """
-    # Create and store test task
-    task = create_test_task()
-    task_processor._tasks[task.id] = task
+    task_processor, task = stored_task
+    
+    # The stream reads from a real queue
     task_processor._task_updates[task.id] = asyncio.Queue()
     
     # Add a single COMPLETED update to queue
-    update = task.copy()
-    update.status.state = TaskState.COMPLETED
-    await task_processor._task_updates[task.id].put(update)
+    update = task.model_copy(update={"status": task.status.model_copy(update={"state": TaskState.COMPLETED})})
+    task_processor._task_updates[task.id].put_nowait(update)
     
-    # Close the queue to signal no more updates
-    task_processor._task_updates[task.id].task_done()
-    
-    # Get updates
-    updates = []
-    async for update in task_processor.get_task_updates(task.id):
-        updates.append(update)
-        if update.status.state in [TaskState.COMPLETED, TaskState.FAILED, TaskState.CANCELLED]:
-            break
+    # Get updates; the stream ends by itself after the terminal update
+    updates = [update async for update in task_processor.get_task_updates(task.id)]
     
     # Verify we got exactly one COMPLETED update
     assert len(updates) == 1, f"Expected 1 update but got {len(updates)}"
     assert updates[0].status.state == TaskState.COMPLETED
 
 @pytest.mark.asyncio
-async def test_cancel_task(task_processor):
+async def test_cancel_task(stored_task):
     """
     Test canceling a task
     """
-    # Create and store test task
-    task = create_test_task()
-    task_processor._tasks[task.id] = task
-    task_processor._task_updates[task.id] = asyncio.Queue()
+    task_processor, task = stored_task
     
     # Cancel task
     cancelled_task = await task_processor.cancel_task(task.id)
@@ -320,26 +345,33 @@ async def test_cancel_task(task_processor):
     assert cancelled_task.id == task.id
     
     # Verify update was sent
-    update = await task_processor._task_updates[task.id].get()
+    update = task_processor._task_updates[task.id].get_nowait()
     assert update.status.state == TaskState.CANCELLED
 
 @pytest.mark.asyncio
-async def test_cancel_nonexistent_task(task_processor):
+@pytest.mark.parametrize("method,args", [
+    ("cancel_task", ()),
+    ("get_task", ()),
+    ("set_push_notification", (PUSH_CONFIG,))
+])
+async def test_nonexistent_task(task_processor, method, args):
     """
-    Test canceling a task that doesn't exist
+    Test task operations that reject a task that doesn't exist
+    
+    @param {TaskProcessor} task_processor - The task processor instance
+    @param {str} method - The TaskProcessor method to call
+    @param {tuple} args - Arguments passed after the task id
     """
     with pytest.raises(ValueError) as exc_info:
-        await task_processor.cancel_task("nonexistent-task")
+        await getattr(task_processor, method)("nonexistent-task", *args)
     assert "Task nonexistent-task not found" in str(exc_info.value)
 
 @pytest.mark.asyncio
-async def test_get_task(task_processor):
+async def test_get_task(stored_task):
     """
     Test retrieving a task
     """
-    # Create and store test task
-    task = create_test_task()
-    task_processor._tasks[task.id] = task
+    task_processor, task = stored_task
     
     # Get task
     retrieved_task = await task_processor.get_task(task.id)
@@ -349,28 +381,14 @@ async def test_get_task(task_processor):
     assert retrieved_task.sessionId == task.sessionId
 
 @pytest.mark.asyncio
-async def test_get_nonexistent_task(task_processor):
-    """
-    Test retrieving a task that doesn't exist
-    """
-    with pytest.raises(ValueError) as exc_info:
-        await task_processor.get_task("nonexistent-task")
-    assert "Task nonexistent-task not found" in str(exc_info.value)
-
-@pytest.mark.asyncio
-async def test_set_push_notification(task_processor):
+async def test_set_push_notification(stored_task):
     """
     Test setting push notification configuration
     """
-    # Create and store test task
-    task = create_test_task()
-    task_processor._tasks[task.id] = task
+    task_processor, task = stored_task
     
     # Set push notification config
-    config = PushNotificationConfig(
-        url="https://test.com/webhook",
-        events=["status", "artifact"]
-    )
+    config = PUSH_CONFIG
     result = await task_processor.set_push_notification(task.id, config)
     
     # Verify
@@ -378,30 +396,14 @@ async def test_set_push_notification(task_processor):
     assert task_processor._push_configs[task.id] == config
 
 @pytest.mark.asyncio
-async def test_set_push_notification_nonexistent_task(task_processor):
-    """
-    Test setting push notification for non-existent task
-    """
-    config = PushNotificationConfig(
-        url="https://test.com/webhook",
-        events=["status", "artifact"]
-    )
-    with pytest.raises(ValueError) as exc_info:
-        await task_processor.set_push_notification("nonexistent-task", config)
-    assert "Task nonexistent-task not found" in str(exc_info.value)
-
-@pytest.mark.asyncio
-async def test_get_push_notification(task_processor):
+async def test_get_push_notification(stored_task):
     """
     Test getting push notification configuration
     """
-    # Create and store test task and config
-    task = create_test_task()
-    task_processor._tasks[task.id] = task
-    config = PushNotificationConfig(
-        url="https://test.com/webhook",
-        events=["status", "artifact"]
-    )
+    task_processor, task = stored_task
+    
+    # Store config
+    config = PUSH_CONFIG
     task_processor._push_configs[task.id] = config
     
     # Get config
@@ -418,14 +420,15 @@ async def test_get_push_notification_nonexistent(task_processor):
     result = await task_processor.get_push_notification("nonexistent-task")
     assert result is None
 
-def test_get_session_tasks(task_processor):
+@pytest.mark.asyncio
+async def test_get_session_tasks(task_processor):
     """
     Test retrieving tasks for a session
     
     @param {TaskProcessor} task_processor - The task processor instance
     """
     # Create session ID
-    session_id = str(uuid.uuid4())
+    session_id = fake_uuid()
     
     # Create multiple tasks with same session ID
     tasks = []
@@ -439,12 +442,11 @@ def test_get_session_tasks(task_processor):
     tasks.append(other_task)
     
     # Store tasks and session info
-    task_processor._active_sessions[session_id] = [t.id for t in tasks[:2]]
-    for task in tasks:
-        task_processor._tasks[task.id] = task
+    task_processor._get_session_context(session_id)["tasks"].extend(t.id for t in tasks[:2])
+    task_processor._tasks.update((task.id, task) for task in tasks)
     
     # Get session tasks
-    session_tasks = task_processor.get_session_tasks(session_id)
+    session_tasks = await task_processor.get_session_tasks(session_id)
     
     # Verify
     assert len(session_tasks) == 2